@@ -1,9 +1,21 @@
 import pygame
 import random
 import heapq
-from typing import List, Tuple, Optional
+import argparse
+import json
+import platform
+import tracemalloc
+import weakref
+from collections import deque
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Tuple, Optional
 import math
+import struct
+import sys
 import time
+import zlib
 
 # initialize pygame
 pygame.init()
@@ -16,6 +28,32 @@ WINDOW_HEIGHT = 600
 GRID_SIZE = 25
 ANIMATION_SPEED = 8
 FPS = 60
+VISIT_ANIMATION_TIME = 0.5  # seconds a newly visited node takes to fade in
+
+# search speeds: animated expands one node every ANIMATION_SPEED ms, fast
+# spends the whole per-frame budget, instant runs to completion without drawing
+# and parallel runs both sides at once in worker processes
+SEARCH_MODES = ['animated', 'fast', 'instant', 'parallel']
+SEARCH_BUDGET = 0.004  # seconds per frame spent advancing searches
+WALL_DENSITY = 0.3
+
+# benchmark corpus: every size and wall density with each seed
+BENCHMARK_SIZES = [64, 256, 512]
+BENCHMARK_DENSITIES = [0.1, 0.25, 0.35]
+BENCHMARK_SEEDS = [0, 1, 2]
+# hierarchical search: clusters of CLUSTER_SIZE x CLUSTER_SIZE cells, border
+# openings shorter than ENTRANCE_SPLIT get one entrance, longer ones one at each end
+CLUSTER_SIZE = 16
+ENTRANCE_SPLIT = 6
+# alt heuristic: landmarks with exact distance tables, of which the few giving
+# the best bound for a query are consulted
+LANDMARK_COUNT = 8
+LANDMARK_ACTIVE = 4
+LANDMARK_MAGIC = b"ALT1"
+LANDMARK_HEADER = struct.Struct("<4sIIII")  # magic, rows, cols, landmarks, crc32 of the walls
+# moving ai map characters that can be walked on, everything else is a wall
+MAP_PASSABLE = set('.GS')
+INF = 2 ** 31 - 1  # unreached cost in the int32 cost arrays
 
 # define colors
 COLORS = {
@@ -43,6 +81,7 @@ class Button:
         self.callback = callback
         self.is_hovered = False
         self.font = pygame.font.Font(None, 28)
+        self.text_surface = self.font.render(self.text, True, COLORS['BUTTON_TEXT'])
 
     # handle mouse events for the button
     def handle_event(self, event: pygame.event.Event) -> bool:
@@ -61,10 +100,9 @@ class Button:
         pygame.draw.rect(surface, color, self.rect, border_radius=8)
         border_color = COLORS['WHITE'] if self.is_hovered else (*COLORS['WHITE'][:3], 150)
         pygame.draw.rect(surface, border_color, self.rect, width=2, border_radius=8)
-        text_surface = self.font.render(self.text, True, COLORS['BUTTON_TEXT'])
-        text_rect = text_surface.get_rect()
+        text_rect = self.text_surface.get_rect()
         text_rect.center = self.rect.center
-        surface.blit(text_surface, text_rect)
+        surface.blit(self.text_surface, text_rect)
 
 # node class to represent each cell in the grid
 class Node:
@@ -77,44 +115,46 @@ class Node:
         self.is_start = False
         self.is_end = False
         self.visited = False
-        self.parent = None
-        self.g = float('inf')
-        self.h = float('inf')
         self.animation_progress = 0.0
         self.visit_time = 0
 
-    # comparison method for priority queue
-    def __lt__(self, other):
-        return (self.g + self.h) < (other.g + other.h)
-
-    # draw the node on the screen
-    def draw(self, surface: pygame.Surface, offset_x: int = 0, current_time: float = 0):
-        rect = pygame.Rect(
-            self.x + offset_x, 
-            self.y, 
-            GRID_SIZE - 1, 
-            GRID_SIZE - 1
-        )
+    # area of the node including the gap to the next cell
+    def cell_rect(self, offset_x: int = 0) -> pygame.Rect:
+        return pygame.Rect(self.x + offset_x, self.y, GRID_SIZE, GRID_SIZE)
+
+    # draw the parts of the node that only change with the maze: floor or wall
+    # and the start or end marker
+    def draw_base(self, surface: pygame.Surface, offset_x: int = 0):
+        rect = pygame.Rect(self.x + offset_x, self.y, GRID_SIZE - 1, GRID_SIZE - 1)
         if self.is_wall:
             pygame.draw.rect(surface, COLORS['BLACK'], rect, border_radius=3)
         else:
             pygame.draw.rect(surface, COLORS['WHITE'], rect, border_radius=3)
-        if self.visited:
-            progress = min(1.0, (current_time - self.visit_time) / 0.5)
-            if progress < 1.0:
-                size_factor = 1.0 - math.sin(progress * math.pi) * 0.2
-                animation_rect = pygame.Rect(
-                    rect.centerx - (rect.width * size_factor) / 2,
-                    rect.centery - (rect.height * size_factor) / 2,
-                    rect.width * size_factor,
-                    rect.height * size_factor
-                )
-                color = COLORS['VISITED_A'] if offset_x == 0 else COLORS['VISITED_D']
-                color_with_alpha = (*color[:3], int(255 * progress))
-                pygame.draw.rect(surface, color_with_alpha, animation_rect, border_radius=3)
-            else:
-                color = COLORS['VISITED_A'] if offset_x == 0 else COLORS['VISITED_D']
-                pygame.draw.rect(surface, color, rect, border_radius=3)
+        self._draw_marker(surface, rect)
+
+    # draw the search state over the base, newly visited nodes grow in
+    def draw_state(self, surface: pygame.Surface, offset_x: int = 0, current_time: float = 0):
+        if not self.visited:
+            return
+        rect = pygame.Rect(self.x + offset_x, self.y, GRID_SIZE - 1, GRID_SIZE - 1)
+        progress = min(1.0, (current_time - self.visit_time) / VISIT_ANIMATION_TIME)
+        color = COLORS['VISITED_A'] if offset_x == 0 else COLORS['VISITED_D']
+        if progress < 1.0:
+            size_factor = 1.0 - math.sin(progress * math.pi) * 0.2
+            animation_rect = pygame.Rect(
+                rect.centerx - (rect.width * size_factor) / 2,
+                rect.centery - (rect.height * size_factor) / 2,
+                rect.width * size_factor,
+                rect.height * size_factor
+            )
+            color_with_alpha = (*color[:3], int(255 * progress))
+            pygame.draw.rect(surface, color_with_alpha, animation_rect, border_radius=3)
+        else:
+            pygame.draw.rect(surface, color, rect, border_radius=3)
+        self._draw_marker(surface, rect)
+
+    # draw the start or end marker if this node has one
+    def _draw_marker(self, surface: pygame.Surface, rect: pygame.Rect):
         if self.is_start:
             self._draw_triangle(surface, rect, COLORS['BLUE'])
         elif self.is_end:
@@ -135,16 +175,791 @@ class Node:
         pygame.draw.circle(surface, COLORS['WHITE'], rect.center, 6)
         pygame.draw.circle(surface, COLORS['RED'], rect.center, 4)
 
+# compact grid the searches run on: walls live in a flat bytearray with a one
+# cell wall border, so a neighbour is just index + offset with no bounds checks
+class GridMap:
+    def __init__(self, rows: int, cols: int, walls=None):
+        self.rows = rows
+        self.cols = cols
+        self.width = cols + 2
+        self.size = (rows + 2) * self.width
+        # walls can be an existing bordered buffer, e.g. shared memory
+        if walls is None:
+            walls = bytearray(b'\x01') * self.size
+            for r in range(rows):
+                start = self.index(r, 0)
+                walls[start:start + cols] = bytes(cols)
+        self.walls = walls
+        # offsets to the right, down, left and up neighbours, shared by every search
+        self.neighbors = (1, self.width, -1, -self.width)
+        self.start = self.index(0, 0)
+        self.end = self.index(rows - 1, cols - 1)
+
+    # random walls, start and end are always kept open
+    @classmethod
+    def random(cls, rows: int, cols: int, density: float = WALL_DENSITY, rng=random) -> 'GridMap':
+        grid = cls(rows, cols)
+        walls = grid.walls
+        for r in range(rows):
+            index = grid.index(r, 0)
+            for c in range(cols):
+                if rng.random() < density:
+                    walls[index + c] = 1
+        walls[grid.start] = 0
+        walls[grid.end] = 0
+        return grid
+
+    # flat index of a cell
+    def index(self, row: int, col: int) -> int:
+        return (row + 1) * self.width + col + 1
+
+    # row and column of a flat index
+    def coords(self, index: int) -> Tuple[int, int]:
+        row, col = divmod(index, self.width)
+        return row - 1, col - 1
+
+    def is_wall(self, row: int, col: int) -> bool:
+        return bool(self.walls[self.index(row, col)])
+
+# shared best-first search over a GridMap, with the manhattan heuristic this is
+# a* and without it dijkstra. yields each expanded index and returns the path.
+# heap entries are (f, h, index): on equal f the node closest to the end wins,
+# which keeps a* from flooding the many equal-cost routes of an open grid.
+def _best_first(grid: GridMap, use_heuristic: bool) -> Iterator[int]:
+    walls = grid.walls
+    neighbors = grid.neighbors
+    width = grid.width
+    start, end = grid.start, grid.end
+    end_row, end_col = divmod(end, width)
+    g = array('i', [INF]) * grid.size
+    parent = array('i', [-1]) * grid.size
+    closed = bytearray(grid.size)
+    g[start] = 0
+    h = 0
+    if use_heuristic:
+        row, col = divmod(start, width)
+        h = abs(row - end_row) + abs(col - end_col)
+    open_set = [(h, h, start)]
+    while open_set:
+        current = heapq.heappop(open_set)[2]
+        if current == end:
+            return reconstruct_path(parent, current)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        yield current
+        cost = g[current] + 1
+        for offset in neighbors:
+            neighbor = current + offset
+            if walls[neighbor] or closed[neighbor] or cost >= g[neighbor]:
+                continue
+            g[neighbor] = cost
+            parent[neighbor] = current
+            if use_heuristic:
+                row, col = divmod(neighbor, width)
+                h = abs(row - end_row) + abs(col - end_col)
+            heapq.heappush(open_set, (cost + h, h, neighbor))
+    return []
+
+# a* with the manhattan distance heuristic
+def a_star(grid: GridMap) -> Iterator[int]:
+    return _best_first(grid, True)
+
+# dijkstra's algorithm, a* without a heuristic
+def dijkstra(grid: GridMap) -> Iterator[int]:
+    return _best_first(grid, False)
+
+# jump point search for 4-connected grids: straight runs are skipped until a
+# cell where an optimal path might turn, and only those jump points are expanded
+def jump_point_search(grid: GridMap) -> Iterator[int]:
+    walls = grid.walls
+    width = grid.width
+    start, end = grid.start, grid.end
+    end_row, end_col = divmod(end, width)
+    g = array('i', [INF]) * grid.size
+    parent = array('i', [-1]) * grid.size
+    closed = bytearray(grid.size)
+
+    def heuristic(index: int) -> int:
+        row, col = divmod(index, width)
+        return abs(row - end_row) + abs(col - end_col)
+
+    # walk from index in steps of step and return the next jump point, or -1
+    def jump(index: int, step: int) -> int:
+        side = width if step in (1, -1) else 1
+        while True:
+            index += step
+            if walls[index]:
+                return -1
+            if index == end:
+                return index
+            # a wall behind an open side cell forces a turn here
+            if (not walls[index + side] and walls[index - step + side]) or \
+                    (not walls[index - side] and walls[index - step - side]):
+                return index
+            # vertical runs also stop where a horizontal run would find a jump point
+            if side == 1 and (jump(index, 1) != -1 or jump(index, -1) != -1):
+                return index
+
+    # directions worth following from a jump point given where it was reached from
+    def directions(index: int) -> Tuple[int, ...]:
+        if parent[index] == -1:
+            return grid.neighbors
+        difference = index - parent[index]
+        if abs(difference) < width:
+            step = 1 if difference > 0 else -1
+            return (step, width, -width)
+        step = width if difference > 0 else -width
+        return (step, 1, -1)
+
+    g[start] = 0
+    h = heuristic(start)
+    open_set = [(h, h, start)]
+    while open_set:
+        current = heapq.heappop(open_set)[2]
+        if current == end:
+            return _fill_path(reconstruct_path(parent, current), width)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        yield current
+        for step in directions(current):
+            point = jump(current, step)
+            if point == -1 or closed[point]:
+                continue
+            cost = g[current] + (point - current) // step
+            if cost < g[point]:
+                g[point] = cost
+                parent[point] = current
+                h = heuristic(point)
+                heapq.heappush(open_set, (cost + h, h, point))
+    return []
+
+# expand a path of jump points into every cell along its straight segments
+def _fill_path(points: List[int], width: int) -> List[int]:
+    path = points[:1]
+    for a, b in zip(points, points[1:]):
+        if abs(b - a) < width:
+            step = 1 if b > a else -1
+        else:
+            step = width if b > a else -width
+        path.extend(range(a + step, b + step, step))
+    return path
+
+# bidirectional a*: searches from the start and from the end take turns, the
+# smaller frontier going first, until neither frontier can beat the best
+# meeting point found so far
+def bidirectional_a_star(grid: GridMap) -> Iterator[int]:
+    walls = grid.walls
+    neighbors = grid.neighbors
+    width = grid.width
+    start, end = grid.start, grid.end
+    g = (array('i', [INF]) * grid.size, array('i', [INF]) * grid.size)
+    parent = (array('i', [-1]) * grid.size, array('i', [-1]) * grid.size)
+    closed = (bytearray(grid.size), bytearray(grid.size))
+    targets = (divmod(end, width), divmod(start, width))
+    g[0][start] = 0
+    g[1][end] = 0
+    row, col = divmod(start, width)
+    h = abs(row - targets[0][0]) + abs(col - targets[0][1])
+    open_sets = ([(h, h, start)], [(h, h, end)])
+    best = INF
+    meeting = -1
+    while open_sets[0] and open_sets[1]:
+        if open_sets[0][0][0] >= best or open_sets[1][0][0] >= best:
+            break
+        side = 0 if len(open_sets[0]) <= len(open_sets[1]) else 1
+        open_set = open_sets[side]
+        g_side, g_other = g[side], g[1 - side]
+        parent_side, closed_side = parent[side], closed[side]
+        target_row, target_col = targets[side]
+        current = heapq.heappop(open_set)[2]
+        if closed_side[current]:
+            continue
+        closed_side[current] = 1
+        yield current
+        cost = g_side[current] + 1
+        for offset in neighbors:
+            neighbor = current + offset
+            if walls[neighbor] or closed_side[neighbor] or cost >= g_side[neighbor]:
+                continue
+            g_side[neighbor] = cost
+            parent_side[neighbor] = current
+            if g_other[neighbor] != INF and cost + g_other[neighbor] < best:
+                best = cost + g_other[neighbor]
+                meeting = neighbor
+            row, col = divmod(neighbor, width)
+            h = abs(row - target_row) + abs(col - target_col)
+            heapq.heappush(open_set, (cost + h, h, neighbor))
+    if meeting == -1:
+        return []
+    return reconstruct_path(parent[0], meeting) + reconstruct_path(parent[1], meeting)[::-1][1:]
+
+# lifelong planning a*: keeps g and rhs (one step lookahead) costs between
+# searches, so after walls change only the cells whose cost is affected are
+# expanded again instead of searching from scratch
+class LifelongPlanner:
+    def __init__(self, grid: GridMap):
+        self.grid = grid
+        self.g = array('i', [INF]) * grid.size
+        self.rhs = array('i', [INF]) * grid.size
+        self.open_set = []
+        self.end_row, self.end_col = divmod(grid.end, grid.width)
+        self.rhs[grid.start] = 0
+        self._push(grid.start)
+
+    def _key(self, index: int) -> Tuple[int, int]:
+        row, col = divmod(index, self.grid.width)
+        cost = min(self.g[index], self.rhs[index])
+        return cost + abs(row - self.end_row) + abs(col - self.end_col), cost
+
+    def _push(self, index: int):
+        heapq.heappush(self.open_set, (*self._key(index), index))
+
+    # recompute a cell's rhs from its neighbours and queue it if inconsistent.
+    # the queue is lazy, outdated entries are skipped when they come up
+    def _update(self, index: int):
+        grid = self.grid
+        if index != grid.start:
+            best = INF
+            if not grid.walls[index]:
+                for offset in grid.neighbors:
+                    cost = self.g[index + offset]
+                    if cost < best:
+                        best = cost
+                if best != INF:
+                    best += 1
+            self.rhs[index] = best
+        if self.g[index] != self.rhs[index]:
+            self._push(index)
+
+    # call after toggling a wall in the grid map, the next search repairs the costs
+    def wall_changed(self, index: int):
+        self._update(index)
+        for offset in self.grid.neighbors:
+            self._update(index + offset)
+
+    # bring the costs up to date, yields each expanded index and returns the path
+    def search(self) -> Iterator[int]:
+        g, rhs, open_set = self.g, self.rhs, self.open_set
+        neighbors = self.grid.neighbors
+        end = self.grid.end
+        while open_set:
+            entry = open_set[0]
+            index = entry[2]
+            key = self._key(index)
+            if g[index] == rhs[index] or entry[:2] != key:
+                heapq.heappop(open_set)
+                continue
+            if key >= self._key(end) and g[end] == rhs[end]:
+                break
+            heapq.heappop(open_set)
+            yield index
+            if g[index] > rhs[index]:
+                g[index] = rhs[index]
+            else:
+                g[index] = INF
+                self._update(index)
+            for offset in neighbors:
+                self._update(index + offset)
+        return self.path()
+
+    # follow the cheapest neighbours back from the end
+    def path(self) -> List[int]:
+        g = self.g
+        start, end = self.grid.start, self.grid.end
+        if g[end] == INF:
+            return []
+        path = [end]
+        current = end
+        while current != start:
+            current = min((current + offset for offset in self.grid.neighbors), key=g.__getitem__)
+            path.append(current)
+        return path[::-1]
+
+# one-off lpa* search, the first search of a planner is a plain a*
+def lpa_star(grid: GridMap) -> Iterator[int]:
+    return LifelongPlanner(grid).search()
+
+# hpa*: the grid is split into clusters joined by entrance cells on their
+# borders. entrances are found once per map, the distances and paths between
+# the entrances of a cluster are worked out the first time a query passes
+# through it and cached. queries search this small graph of entrances and are
+# then refined by stitching the cached paths together. a wall change only
+# rescans the borders of its cluster and drops the cached paths nearby.
+class HierarchicalPlanner:
+    def __init__(self, grid: GridMap, cluster_size: int = CLUSTER_SIZE):
+        # only a weak reference, the planner is cached per grid map and
+        # must not keep its map alive
+        self._grid = weakref.ref(grid)
+        self.cluster_size = cluster_size
+        self.cluster_rows = (grid.rows + cluster_size - 1) // cluster_size
+        self.cluster_cols = (grid.cols + cluster_size - 1) // cluster_size
+        self.transitions: Dict[Tuple[str, int, int], List[Tuple[int, int]]] = {}  # border -> entrance pairs
+        self.inter: Dict[int, List[int]] = {}  # entrance -> entrances across a border
+        self.intra: Dict[int, Dict[int, List[Tuple[int, int, List[int]]]]] = {}  # cluster -> lazily built edges
+        for cr in range(self.cluster_rows):
+            for cc in range(self.cluster_cols):
+                for border in (('h', cr, cc), ('v', cr, cc)):
+                    if self._border_exists(border):
+                        self._set_border(border, self._scan_border(border))
+
+    @property
+    def grid(self) -> GridMap:
+        return self._grid()
+
+    # the planner for a grid map, kept while the map is alive so repeated
+    # queries reuse the abstraction
+    @classmethod
+    def for_grid(cls, grid: GridMap) -> 'HierarchicalPlanner':
+        planner = _hierarchies.get(grid)
+        if planner is None:
+            planner = _hierarchies[grid] = cls(grid)
+        return planner
+
+    # 'h' borders run between a cluster and the one to its right, 'v' borders
+    # between a cluster and the one below it
+    def _border_exists(self, border: Tuple[str, int, int]) -> bool:
+        kind, cr, cc = border
+        if not (0 <= cr < self.cluster_rows and 0 <= cc < self.cluster_cols):
+            return False
+        return cc + 1 < self.cluster_cols if kind == 'h' else cr + 1 < self.cluster_rows
+
+    # find the entrance pairs along a border
+    def _scan_border(self, border: Tuple[str, int, int]) -> List[Tuple[int, int]]:
+        kind, cr, cc = border
+        grid, size = self.grid, self.cluster_size
+        if kind == 'h':
+            col = (cc + 1) * size - 1
+            pairs = [(grid.index(r, col), grid.index(r, col + 1)) for r in range(cr * size, min((cr + 1) * size, grid.rows))]
+        else:
+            row = (cr + 1) * size - 1
+            pairs = [(grid.index(row, c), grid.index(row + 1, c)) for c in range(cc * size, min((cc + 1) * size, grid.cols))]
+        walls = grid.walls
+        transitions = []
+        run = []
+        for a, b in pairs + [(0, 0)]:
+            if not walls[a] and not walls[b]:
+                run.append((a, b))
+                continue
+            if len(run) >= ENTRANCE_SPLIT:
+                transitions += [run[0], run[-1]]
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        return transitions
+
+    # replace the entrances of a border and their links across it
+    def _set_border(self, border: Tuple[str, int, int], transitions: List[Tuple[int, int]]):
+        inter = self.inter
+        for a, b in self.transitions.get(border, ()):
+            inter[a].remove(b)
+            inter[b].remove(a)
+            for node in (a, b):
+                if not inter[node]:
+                    del inter[node]
+        self.transitions[border] = transitions
+        for a, b in transitions:
+            inter.setdefault(a, []).append(b)
+            inter.setdefault(b, []).append(a)
+
+    def _cluster_of(self, index: int) -> int:
+        row, col = self.grid.coords(index)
+        return (row // self.cluster_size) * self.cluster_cols + col // self.cluster_size
+
+    # entrance cells inside a cluster, collected from its four borders
+    def _cluster_nodes(self, cluster: int) -> List[int]:
+        cr, cc = divmod(cluster, self.cluster_cols)
+        nodes = set()
+        for border, side in ((('h', cr, cc), 0), (('h', cr, cc - 1), 1), (('v', cr, cc), 0), (('v', cr - 1, cc), 1)):
+            for pair in self.transitions.get(border, ()):
+                nodes.add(pair[side])
+        return sorted(nodes)
+
+    # breadth first search that stays inside a cluster, returns distances and parents
+    def _local_search(self, cluster: int, source: int, target: int = -1) -> Tuple[Dict[int, int], Dict[int, int]]:
+        grid = self.grid
+        walls, neighbors, width, size = grid.walls, grid.neighbors, grid.width, self.cluster_size
+        cr, cc = divmod(cluster, self.cluster_cols)
+        row0, col0 = cr * size + 1, cc * size + 1  # bordered coordinates
+        row1, col1 = row0 + size, col0 + size
+        dist = {source: 0}
+        parent = {source: -1}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            if current == target:
+                break
+            cost = dist[current] + 1
+            for offset in neighbors:
+                neighbor = current + offset
+                if walls[neighbor] or neighbor in dist:
+                    continue
+                row, col = divmod(neighbor, width)
+                if row0 <= row < row1 and col0 <= col < col1:
+                    dist[neighbor] = cost
+                    parent[neighbor] = current
+                    queue.append(neighbor)
+        return dist, parent
+
+    # edges from a cell to every entrance of its cluster it can reach: (entrance, distance, path)
+    def _connect(self, cluster: int, cell: int) -> List[Tuple[int, int, List[int]]]:
+        dist, parent = self._local_search(cluster, cell)
+        edges = []
+        for node in self._cluster_nodes(cluster):
+            if node != cell and node in dist:
+                path = reconstruct_path(parent, node)
+                edges.append((node, dist[node], path))
+        return edges
+
+    # edges between the entrances of a cluster, built on first use
+    def _cluster_edges(self, cluster: int) -> Dict[int, List[Tuple[int, int, List[int]]]]:
+        edges = self.intra.get(cluster)
+        if edges is None:
+            edges = self.intra[cluster] = {node: self._connect(cluster, node) for node in self._cluster_nodes(cluster)}
+        return edges
+
+    # call after toggling a wall in the grid map
+    def wall_changed(self, index: int):
+        cluster = self._cluster_of(index)
+        cr, cc = divmod(cluster, self.cluster_cols)
+        for border in (('h', cr, cc), ('h', cr, cc - 1), ('v', cr, cc), ('v', cr - 1, cc)):
+            if self._border_exists(border):
+                self._set_border(border, self._scan_border(border))
+        for r, c in ((cr, cc), (cr, cc - 1), (cr, cc + 1), (cr - 1, cc), (cr + 1, cc)):
+            if 0 <= r < self.cluster_rows and 0 <= c < self.cluster_cols:
+                self.intra.pop(r * self.cluster_cols + c, None)
+
+    # search the entrance graph, yields each expanded abstract node and returns the refined path
+    def search(self) -> Iterator[int]:
+        grid = self.grid
+        start, end = grid.start, grid.end
+        width = grid.width
+        end_row, end_col = divmod(end, width)
+        start_cluster, end_cluster = self._cluster_of(start), self._cluster_of(end)
+        if start_cluster == end_cluster:
+            dist, parent = self._local_search(start_cluster, start, end)
+            if end in dist:
+                return reconstruct_path(parent, end)
+
+        start_edges = self._connect(start_cluster, start)
+        end_edges = {node: (cost, path[::-1]) for node, cost, path in self._connect(end_cluster, end)}
+        g = {start: 0}
+        came_from: Dict[int, Tuple[int, List[int]]] = {}
+        closed = set()
+        row, col = divmod(start, width)
+        h = abs(row - end_row) + abs(col - end_col)
+        open_set = [(h, h, start)]
+        while open_set:
+            node = heapq.heappop(open_set)[2]
+            if node == end:
+                break
+            if node in closed:
+                continue
+            closed.add(node)
+            yield node
+            if node == start:
+                edges = list(start_edges)
+            else:
+                edges = list(self._cluster_edges(self._cluster_of(node)).get(node, ()))
+            edges += [(other, 1, [node, other]) for other in self.inter.get(node, ())]
+            if node in end_edges:
+                edges.append((end, *end_edges[node]))
+            for other, cost, path in edges:
+                cost += g[node]
+                if other in closed or cost >= g.get(other, INF):
+                    continue
+                g[other] = cost
+                came_from[other] = (node, path)
+                row, col = divmod(other, width)
+                h = abs(row - end_row) + abs(col - end_col)
+                heapq.heappush(open_set, (cost + h, h, other))
+        else:
+            return []
+
+        # refine by stitching together the cell paths of the abstract edges
+        segments = []
+        node = end
+        while node != start:
+            node, path = came_from[node]
+            segments.append(path)
+        path = [start]
+        for segment in reversed(segments):
+            path.extend(segment[1:])
+        return path
+
+_hierarchies: 'weakref.WeakKeyDictionary[GridMap, HierarchicalPlanner]' = weakref.WeakKeyDictionary()
+
+# hpa* query on a grid map, reusing the map's abstraction across queries. it
+# is a generator itself, so the entrance scan of a new map runs on the first
+# step and counts toward the search's time
+def hpa_star(grid: GridMap) -> Iterator[int]:
+    return (yield from HierarchicalPlanner.for_grid(grid).search())
+
+# breadth first distances from one cell to every cell, INF where unreachable
+def grid_distances(grid: GridMap, source: int) -> array:
+    walls, neighbors = grid.walls, grid.neighbors
+    dist = array('i', [INF]) * grid.size
+    dist[source] = 0
+    frontier = [source]
+    cost = 0
+    while frontier:
+        cost += 1
+        reached = []
+        for current in frontier:
+            for offset in neighbors:
+                neighbor = current + offset
+                if not walls[neighbor] and dist[neighbor] == INF:
+                    dist[neighbor] = cost
+                    reached.append(neighbor)
+        frontier = reached
+    return dist
+
+# alt: exact distances from a few landmarks give, by the triangle inequality,
+# the lower bound |d(L, goal) - d(L, cell)|, which unlike the manhattan
+# distance accounts for detours around walls. the tables only hold for the
+# walls they were built on, so they are rebuilt when the map changes
+class LandmarkTable:
+    def __init__(self, grid: GridMap, landmarks: List[int], tables: List[array]):
+        # only a weak reference, the tables are cached per grid map and must
+        # not keep their map alive
+        self._grid = weakref.ref(grid)
+        self.landmarks = landmarks
+        self.tables = tables
+
+    @property
+    def grid(self) -> GridMap:
+        return self._grid()
+
+    # pick landmarks by farthest point selection: each one is the cell farthest
+    # from the landmarks chosen so far, so they end up spread around the map edges
+    @classmethod
+    def build(cls, grid: GridMap, count: int = LANDMARK_COUNT) -> 'LandmarkTable':
+        walls = grid.walls
+        first = next(index for index in range(grid.size) if not walls[index])
+        seed = grid_distances(grid, first)
+        seed = array('i', (-1 if d == INF else d for d in seed))
+        # walls never become landmarks, open cells no landmark reaches are picked first
+        closest = array('i', (-1 if wall else INF for wall in walls))
+        landmarks, tables = [seed.index(max(seed))], []
+        while True:
+            table = grid_distances(grid, landmarks[-1])
+            tables.append(table)
+            closest = array('i', map(min, closest, table))
+            farthest = max(closest)
+            if len(landmarks) == count or farthest <= 0:
+                break
+            landmarks.append(closest.index(farthest))
+        return cls(grid, landmarks, tables)
+
+    # the table kept for a grid map, built on first use
+    @classmethod
+    def for_grid(cls, grid: GridMap) -> 'LandmarkTable':
+        table = _landmarks.get(grid)
+        if table is None:
+            table = _landmarks[grid] = cls.build(grid)
+        return table
+
+    # load the tables saved next to a map file, or build and save them when
+    # they are missing or were built for different walls
+    @classmethod
+    def for_map(cls, grid: GridMap, map_path: str, count: int = LANDMARK_COUNT) -> 'LandmarkTable':
+        path = map_path + '.landmarks'
+        try:
+            table = cls.load(path, grid)
+        except (OSError, ValueError):
+            table = None
+        if table is None or len(table.landmarks) != count:
+            table = cls.build(grid, count)
+            table.save(path)
+        _landmarks[grid] = table
+        return table
+
+    # little endian header, landmark indices and int32 tables
+    def save(self, path: str):
+        grid = self.grid
+        with open(path, 'wb') as file:
+            file.write(LANDMARK_HEADER.pack(LANDMARK_MAGIC, grid.rows, grid.cols, len(self.landmarks), zlib.crc32(grid.walls)))
+            for values in [array('i', self.landmarks)] + self.tables:
+                if sys.byteorder == 'big':
+                    values = array('i', values)
+                    values.byteswap()
+                values.tofile(file)
+
+    # returns None when the file was saved for other walls
+    @classmethod
+    def load(cls, path: str, grid: GridMap) -> Optional['LandmarkTable']:
+        with open(path, 'rb') as file:
+            header = file.read(LANDMARK_HEADER.size)
+            if len(header) != LANDMARK_HEADER.size:
+                raise ValueError(f"{path} is not a landmark file")
+            magic, rows, cols, count, checksum = LANDMARK_HEADER.unpack(header)
+            if magic != LANDMARK_MAGIC:
+                raise ValueError(f"{path} is not a landmark file")
+            if (rows, cols, checksum) != (grid.rows, grid.cols, zlib.crc32(grid.walls)):
+                return None
+            arrays = []
+            for length in [count] + [grid.size] * count:
+                values = array('i')
+                values.fromfile(file, length)  # raises EOFError, a ValueError, if truncated
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                arrays.append(values)
+        return cls(grid, list(arrays[0]), arrays[1:])
+
+    # a* with the alt bound, yields expanded cells and returns the path. costs
+    # live in dicts rather than grid sized arrays so that many short queries on
+    # a large map don't pay for allocating the arrays each time
+    def search(self, start: int, end: int) -> Iterator[int]:
+        walls, neighbors, width = self.grid.walls, self.grid.neighbors, self.grid.width
+        end_row, end_col = divmod(end, width)
+        # a landmark reaches either both ends or neither; if only one, there is no path
+        bounds = []
+        for table in self.tables:
+            to_start, to_end = table[start], table[end]
+            if (to_start == INF) != (to_end == INF):
+                return []
+            if to_end != INF:
+                bounds.append((abs(to_start - to_end), table, to_end))
+        bounds.sort(key=lambda bound: bound[0], reverse=True)
+        active = [(table, to_end) for _, table, to_end in bounds[:LANDMARK_ACTIVE]]
+
+        g = {start: 0}
+        parent = {start: -1}
+        closed = set()
+        open_set = [(0, 0, start)]
+        while open_set:
+            current = heapq.heappop(open_set)[2]
+            if current == end:
+                return reconstruct_path(parent, current)
+            if current in closed:
+                continue
+            closed.add(current)
+            yield current
+            cost = g[current] + 1
+            for offset in neighbors:
+                neighbor = current + offset
+                if walls[neighbor] or neighbor in closed or cost >= g.get(neighbor, INF):
+                    continue
+                g[neighbor] = cost
+                parent[neighbor] = current
+                row, col = divmod(neighbor, width)
+                h = abs(row - end_row) + abs(col - end_col)
+                for table, to_end in active:
+                    bound = abs(table[neighbor] - to_end)
+                    if bound > h:
+                        h = bound
+                heapq.heappush(open_set, (cost + h, h, neighbor))
+        return []
+
+    # answer many (start, end) index pairs, returns (path, expanded) for each
+    def batch(self, queries: List[Tuple[int, int]]) -> List[Tuple[List[int], int]]:
+        results = []
+        for start, end in queries:
+            search = self.search(start, end)
+            expanded = 0
+            while True:
+                try:
+                    next(search)
+                    expanded += 1
+                except StopIteration as done:
+                    results.append((done.value, expanded))
+                    break
+        return results
+
+_landmarks: 'weakref.WeakKeyDictionary[GridMap, LandmarkTable]' = weakref.WeakKeyDictionary()
+
+# a* with the alt heuristic, building the landmark tables for the map on first
+# use. like hpa_star it is a generator, so the build counts toward the search's time
+def alt_a_star(grid: GridMap) -> Iterator[int]:
+    table = LandmarkTable.for_grid(grid)
+    return (yield from table.search(grid.start, grid.end))
+
+# per map preprocessing of the searches that have it, with the cache it fills
+PREPROCESSING = {
+    'hpa': (HierarchicalPlanner.for_grid, _hierarchies),
+    'alt': (LandmarkTable.for_grid, _landmarks),
+}
+
+# searches the visualizer can compare, with the titles shown above each side
+ALGORITHMS = {
+    'astar': a_star,
+    'dijkstra': dijkstra,
+    'jps': jump_point_search,
+    'bidirectional': bidirectional_a_star,
+    'lpa': lpa_star,
+    'hpa': hpa_star,
+    'alt': alt_a_star,
+}
+ALGORITHM_TITLES = {
+    'astar': "A*",
+    'dijkstra': "Dijkstra's",
+    'jps': "Jump Point Search",
+    'bidirectional': "Bidirectional A*",
+    'lpa': "LPA*",
+    'hpa': "HPA*",
+    'alt': "ALT A*",
+}
+
+# run an algorithm to completion, returns the path, expanded nodes and seconds
+def run_search(grid: GridMap, name: str) -> Tuple[List[int], int, float]:
+    search = ALGORITHMS[name](grid)
+    expanded = 0
+    started = time.perf_counter()
+    while True:
+        try:
+            next(search)
+        except StopIteration as finished:
+            return finished.value, expanded, time.perf_counter() - started
+        expanded += 1
+
+# process pool worker: run one algorithm on the shared wall grid
+def _search_worker(memory_name: str, rows: int, cols: int, name: str) -> Tuple[List[int], int, float]:
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        return run_search(GridMap(rows, cols, memory.buf), name)
+    finally:
+        memory.close()
+
+# run several algorithms at once in worker processes, so a comparison costs
+# about as long as the slowest one. the walls are copied into shared memory
+# once instead of being pickled for every worker.
+def compare_parallel(grid: GridMap, names: List[str], workers: Optional[int] = None) -> Dict[str, Tuple[List[int], int, float]]:
+    memory = shared_memory.SharedMemory(create=True, size=grid.size)
+    try:
+        memory.buf[:grid.size] = grid.walls
+        with ProcessPoolExecutor(max_workers=workers or len(names)) as pool:
+            futures = {name: pool.submit(_search_worker, memory.name, grid.rows, grid.cols, name) for name in names}
+            return {name: future.result() for name, future in futures.items()}
+    finally:
+        memory.close()
+        memory.unlink()
+
+# walk the parent array (or dict) back from the end index
+def reconstruct_path(parent, end: int) -> List[int]:
+    path = []
+    current = end
+    while current != -1:
+        path.append(current)
+        current = parent[current]
+    return path[::-1]
+
 # pathfinding visualizer class to manage the visualization
 class PathfindingVisualizer:
     def __init__(self):
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("Pathfinding Visualizer - A* vs Dijkstra")
         self.clock = pygame.time.Clock()
         self.rows = WINDOW_HEIGHT // GRID_SIZE
         self.cols = (WINDOW_WIDTH // 2) // GRID_SIZE
+        self.grid_map = GridMap(self.rows, self.cols)
         self.grid_a = self._create_grid()
         self.grid_d = self._create_grid()
+        # render cache: fonts and titles are made once, the maze is baked into
+        # background and grid_layer only redraws the nodes in dirty_nodes
+        self.title_font = pygame.font.Font(None, 36)
+        self.stats_font = pygame.font.Font(None, 24)
+        self.text_cache: Dict[Tuple[str, str], Tuple[str, pygame.Surface]] = {}
+        self._bake_background()
         button_width = 160
         button_height = 40
         total_buttons_width = button_width * 3 + 40
@@ -158,86 +973,100 @@ class PathfindingVisualizer:
         self.searching = False
         self.path_a = []
         self.path_d = []
+        self.searches: Dict[str, Iterator[Node]] = {}
+        self.algorithms = {'a': 'astar', 'd': 'dijkstra'}
+        self.stats = {'a': [0, 0.0], 'd': [0, 0.0]}  # expanded nodes and seconds per side
+        self.planners: Dict[str, LifelongPlanner] = {}  # incremental searches kept between wall edits
+        self.paint_walls: Optional[bool] = None  # True or False while dragging walls on or off
+        self.search_mode = SEARCH_MODES[0]
         self.start_time = time.time()
+        self._update_caption()
 
-    # a* algorithm implementation
-    def _a_star(self, grid: List[List[Node]]) -> List[Node]:
-        start = grid[0][0]
-        end = grid[self.rows-1][self.cols-1]
-        start.g = 0
-        start.h = self._manhattan_distance(start, end)
-        open_set = [(start.g + start.h, start)]
-        closed_set = set()
-        while open_set and self.searching:
-            current = heapq.heappop(open_set)[1]
-            if current == end:
-                return self._reconstruct_path(current)
-            if current not in closed_set:
-                closed_set.add(current)
-                current.visited = True
-                current.visit_time = time.time()
-                self._draw()
-                pygame.time.wait(ANIMATION_SPEED)
-                for neighbor in self._get_neighbors(current, grid):
-                    if neighbor in closed_set or neighbor.is_wall:
-                        continue
-                    tentative_g = current.g + 1
-                    if tentative_g < neighbor.g:
-                        neighbor.parent = current
-                        neighbor.g = tentative_g
-                        neighbor.h = self._manhattan_distance(neighbor, end)
-                        heapq.heappush(open_set, (neighbor.g + neighbor.h, neighbor))
-        return []
+    # run one side's algorithm, yields each expanded node and returns the path.
+    # lpa* keeps its planner so wall edits can be repaired incrementally
+    def _search(self, side: str) -> Iterator[Node]:
+        name = self.algorithms[side]
+        if name == 'lpa':
+            planner = self.planners[side] = LifelongPlanner(self.grid_map)
+            return self._show_search(planner.search(), side)
+        return self._show_search(ALGORITHMS[name](self.grid_map), side)
 
-    # dijkstra's algorithm implementation
-    def _dijkstra(self, grid: List[List[Node]]) -> List[Node]:
-        start = grid[0][0]
-        end = grid[self.rows-1][self.cols-1]
-        start.g = 0
-        pq = [(0, start)]
-        visited = set()
-        while pq and self.searching:
-            current = heapq.heappop(pq)[1]
-            if current == end:
-                return self._reconstruct_path(current)
-            if current not in visited:
-                visited.add(current)
-                current.visited = True
-                current.visit_time = time.time()
-                self._draw()
-                pygame.time.wait(ANIMATION_SPEED)
-                for neighbor in self._get_neighbors(current, grid):
-                    if neighbor in visited or neighbor.is_wall:
-                        continue
-                    tentative_g = current.g + 1
-                    if tentative_g < neighbor.g:
-                        neighbor.parent = current
-                        neighbor.g = tentative_g
-                        heapq.heappush(pq, (neighbor.g, neighbor))
-        return []
+    # node grid shown on one side
+    def _grid(self, side: str) -> List[List[Node]]:
+        return self.grid_a if side == 'a' else self.grid_d
+
+    # screen x offset of one side
+    def _offset(self, side: str) -> int:
+        return 0 if side == 'a' else WINDOW_WIDTH // 2
+
+    # mirror a search on the grid map onto the nodes that render it
+    def _show_search(self, search: Iterator[int], side: str) -> Iterator[Node]:
+        grid = self._grid(side)
+        offset_x = self._offset(side)
+        coords = self.grid_map.coords
+        while True:
+            try:
+                index = next(search)
+            except StopIteration as finished:
+                return [grid[r][c] for r, c in map(coords, finished.value)]
+            r, c = coords(index)
+            node = grid[r][c]
+            node.visited = True
+            node.visit_time = time.time()
+            self.dirty_nodes.add((node, offset_x))
+            yield node
 
     # draw the grid and paths on the screen
     def _draw(self):
-        self.screen.fill(COLORS['GREY'])
-        current_time = time.time()
-        for r in range(self.rows):
-            for c in range(self.cols):
-                self.grid_a[r][c].draw(self.screen, 0, current_time)
-                self.grid_d[r][c].draw(self.screen, WINDOW_WIDTH//2, current_time)
+        self._redraw_dirty_nodes(time.time())
+        self.screen.blit(self.grid_layer, (0, 0))
         self._draw_path(self.path_a, COLORS['BLUE'], 0)
         self._draw_path(self.path_d, COLORS['GREEN'], WINDOW_WIDTH//2)
         pygame.draw.line(self.screen, COLORS['WHITE'],
             (WINDOW_WIDTH//2, 0), (WINDOW_WIDTH//2, WINDOW_HEIGHT), 2)
-        font = pygame.font.Font(None, 36)
-        a_star_text = font.render("A* Algorithm", True, COLORS['BLUE'])
-        dijkstra_text = font.render("Dijkstra's Algorithm", True, COLORS['GREEN'])
         padding = 40
-        self.screen.blit(a_star_text, (WINDOW_WIDTH//4 - a_star_text.get_width()//2, padding))
-        self.screen.blit(dijkstra_text, (3*WINDOW_WIDTH//4 - dijkstra_text.get_width()//2, padding))
+        for side, center_x, color in (('a', WINDOW_WIDTH//4, COLORS['BLUE']), ('d', 3*WINDOW_WIDTH//4, COLORS['GREEN'])):
+            title_text = self._text(side + 'title', self.title_font, ALGORITHM_TITLES[self.algorithms[side]], color)
+            self.screen.blit(title_text, (center_x - title_text.get_width()//2, padding))
+            expanded, elapsed = self.stats[side]
+            stats_text = self._text(side + 'stats', self.stats_font, f"{expanded} expanded, {elapsed * 1000:.1f} ms", color)
+            self.screen.blit(stats_text, (center_x - stats_text.get_width()//2, padding + 30))
         for button in self.buttons:
             button.draw(self.screen)
         pygame.display.flip()
 
+    # rendered text for a slot on screen, only re-rendered when the text changes
+    def _text(self, slot: str, font: pygame.font.Font, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        cached = self.text_cache.get((slot, font))
+        if cached is None or cached[0] != text:
+            cached = self.text_cache[(slot, font)] = (text, font.render(text, True, color))
+        return cached[1]
+
+    # bake the floor, walls and markers of both grids into the background and
+    # start the grid layer from it
+    def _bake_background(self):
+        self.background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.background.fill(COLORS['GREY'])
+        for side in ('a', 'd'):
+            offset_x = self._offset(side)
+            for row in self._grid(side):
+                for node in row:
+                    node.draw_base(self.background, offset_x)
+        self.grid_layer = self.background.copy()
+        self.dirty_nodes = set()
+
+    # redraw the nodes whose search state changed, animating nodes stay dirty
+    # until their animation has finished
+    def _redraw_dirty_nodes(self, current_time: float):
+        finished = []
+        for node, offset_x in self.dirty_nodes:
+            area = node.cell_rect(offset_x)
+            self.grid_layer.blit(self.background, area, area)
+            node.draw_state(self.grid_layer, offset_x, current_time)
+            if not node.visited or current_time - node.visit_time >= VISIT_ANIMATION_TIME:
+                finished.append((node, offset_x))
+        self.dirty_nodes.difference_update(finished)
+
     # draw the path on the screen
     def _draw_path(self, path: List[Node], color: Tuple[int, int, int], offset_x: int):
         if not path:
@@ -261,75 +1090,172 @@ class PathfindingVisualizer:
             self.clock.tick(FPS)
         pygame.quit()
 
-    # create a grid of nodes
+    # create the grid of nodes that renders the grid map
     def _create_grid(self) -> List[List[Node]]:
-        return [[Node(r, c) for c in range(self.cols)] for r in range(self.rows)]
+        grid = [[Node(r, c) for c in range(self.cols)] for r in range(self.rows)]
+        for row in grid:
+            for node in row:
+                node.is_wall = self.grid_map.is_wall(node.row, node.col)
+        start_r, start_c = self.grid_map.coords(self.grid_map.start)
+        end_r, end_c = self.grid_map.coords(self.grid_map.end)
+        grid[start_r][start_c].is_start = True
+        grid[end_r][end_c].is_end = True
+        return grid
 
     # generate a new maze
     def _generate_new_maze(self):
+        self.grid_map = GridMap.random(self.rows, self.cols)
         self.grid_a = self._create_grid()
         self.grid_d = self._create_grid()
-
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if random.random() < 0.3:
-                    self.grid_a[r][c].is_wall = True
-                    self.grid_d[r][c].is_wall = True
-        self.grid_a[0][0].is_start = True
-        self.grid_d[0][0].is_start = True
-        self.grid_a[self.rows-1][self.cols-1].is_end = True
-        self.grid_d[self.rows-1][self.cols-1].is_end = True
-        for grid in [self.grid_a, self.grid_d]:
-            grid[0][0].is_wall = False
-            grid[self.rows-1][self.cols-1].is_wall = False
+        self._bake_background()
         self._clear_path()
 
     # clear the current path
     def _clear_path(self):
-        self.path_a = []
-        self.path_d = []
-        self.searching = False
-        for r in range(self.rows):
-            for c in range(self.cols):
-                for node in [self.grid_a[r][c], self.grid_d[r][c]]:
-                    node.visited = False
-                    node.parent = None
-                    node.g = float('inf')
-                    node.h = float('inf')
-                    node.animation_progress = 0
-                    node.visit_time = 0
-
-    # start the search algorithms
+        self._clear_side('a')
+        self._clear_side('d')
+
+    # forget one side's search, path and planner
+    def _clear_side(self, side: str):
+        self._finish_search(side, [])
+        self.stats[side] = [0, 0.0]
+        self.planners.pop(side, None)
+        self._clear_visited(side)
+        self.searching = bool(self.searches)
+
+    # reset the visited animation of one side's nodes
+    def _clear_visited(self, side: str):
+        for row in self._grid(side):
+            for node in row:
+                node.visited = False
+                node.animation_progress = 0
+                node.visit_time = 0
+        offset_x = self._offset(side)
+        self.dirty_nodes = {(node, x) for node, x in self.dirty_nodes if x != offset_x}
+        area = pygame.Rect(offset_x, 0, WINDOW_WIDTH // 2, WINDOW_HEIGHT)
+        self.grid_layer.blit(self.background, area, area)
+
+    # start the search algorithms, they are advanced a few steps every frame
     def _start_search(self):
         if not self.searching:
             self._clear_path()
             self.searching = True
-            self.path_a = self._a_star(self.grid_a)
-            self.path_d = self._dijkstra(self.grid_d)
-
-    # calculate manhattan distance between two nodes
-    def _manhattan_distance(self, node1: Node, node2: Node) -> int:
-        return abs(node1.row - node2.row) + abs(node1.col - node2.col)
-
-    # get the neighbors of a node
-    def _get_neighbors(self, node: Node, grid: List[List[Node]]) -> List[Node]:
-        neighbors = []
-        for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            r, c = node.row + dr, node.col + dc
-            if 0 <= r < self.rows and 0 <= c < self.cols:
-                neighbors.append(grid[r][c])
-        return neighbors
-
-    # reconstruct the path from end node to start node
-    def _reconstruct_path(self, end_node: Node) -> List[Node]:
-        path = []
-        current = end_node
-        while current:
-            path.append(current)
-            current = current.parent
-            self._draw()
-            pygame.time.wait(ANIMATION_SPEED // 2)
-        return path[::-1]
+            if self.search_mode == 'parallel':
+                self._run_parallel()
+                return
+            self.searches = {'a': self._search('a'), 'd': self._search('d')}
+            if self.search_mode == 'instant':
+                self._advance_searches()
+
+    # run both sides in worker processes and show the merged paths and stats
+    def _run_parallel(self):
+        results = compare_parallel(self.grid_map, list(set(self.algorithms.values())))
+        coords = self.grid_map.coords
+        for side, grid in (('a', self.grid_a), ('d', self.grid_d)):
+            path, expanded, elapsed = results[self.algorithms[side]]
+            self.stats[side] = [expanded, elapsed]
+            self._finish_search(side, [grid[r][c] for r, c in map(coords, path)])
+        self.searching = False
+
+    # step both searches in turn until they finish, max_steps rounds are done
+    # or the time budget runs out. time spent inside each search is added to its stats
+    def _advance_searches(self, budget: Optional[float] = None, max_steps: Optional[int] = None):
+        deadline = None if budget is None else time.perf_counter() + budget
+        steps = 0
+        while self.searches:
+            for side in list(self.searches):
+                self._step_search(side)
+            steps += 1
+            if max_steps is not None and steps >= max_steps:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        if not self.searches:
+            self.searching = False
+
+    # advance one side's search by one expansion, returns False once it has finished
+    def _step_search(self, side: str) -> bool:
+        stats = self.stats[side]
+        started = time.perf_counter()
+        try:
+            next(self.searches[side])
+            stats[0] += 1
+            running = True
+        except StopIteration as finished:
+            self._finish_search(side, finished.value)
+            running = False
+        stats[1] += time.perf_counter() - started
+        return running
+
+    # turn a cell into a wall or back into floor. lpa* sides repair their path
+    # right away, the other sides' results are outdated and cleared
+    def _set_wall(self, row: int, col: int, is_wall: bool):
+        grid_map = self.grid_map
+        index = grid_map.index(row, col)
+        if index in (grid_map.start, grid_map.end) or grid_map.walls[index] == is_wall:
+            return
+        grid_map.walls[index] = is_wall
+        hierarchy = _hierarchies.get(grid_map)
+        if hierarchy is not None:
+            hierarchy.wall_changed(index)
+        _landmarks.pop(grid_map, None)
+        for side in ('a', 'd'):
+            node = self._grid(side)[row][col]
+            node.is_wall = is_wall
+            offset_x = self._offset(side)
+            self.background.fill(COLORS['GREY'], node.cell_rect(offset_x))
+            node.draw_base(self.background, offset_x)
+            self.dirty_nodes.add((node, offset_x))
+        for side in ('a', 'd'):
+            planner = self.planners.get(side)
+            if planner is None:
+                self._clear_side(side)
+                continue
+            planner.wall_changed(index)
+            if side not in self.searches:
+                # show only the cells the repair touched
+                self._clear_visited(side)
+                self.stats[side] = [0, 0.0]
+                self.searches[side] = self._show_search(planner.search(), side)
+                while self._step_search(side):
+                    pass
+        self.searching = bool(self.searches)
+
+    # grid cell under a screen position on either side, or None
+    def _cell_at(self, pos: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        if any(button.rect.collidepoint(pos) for button in self.buttons):
+            return None
+        row = pos[1] // GRID_SIZE
+        col = (pos[0] % (WINDOW_WIDTH // 2)) // GRID_SIZE
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    # store the path of a finished search
+    def _finish_search(self, side: str, path: List[Node]):
+        self.searches.pop(side, None)
+        if side == 'a':
+            self.path_a = path
+        else:
+            self.path_d = path
+
+    # cycle through the search speeds
+    def _next_search_mode(self):
+        self.search_mode = SEARCH_MODES[(SEARCH_MODES.index(self.search_mode) + 1) % len(SEARCH_MODES)]
+        self._update_caption()
+
+    # switch one side to the next algorithm, the old results no longer apply
+    def _next_algorithm(self, side: str):
+        names = list(ALGORITHMS)
+        self.algorithms[side] = names[(names.index(self.algorithms[side]) + 1) % len(names)]
+        self._clear_path()
+        self._update_caption()
+
+    # show the algorithms and search speed in the window title
+    def _update_caption(self):
+        pygame.display.set_caption(f"Pathfinding Visualizer - {ALGORITHM_TITLES[self.algorithms['a']]} "
+                                   f"vs {ALGORITHM_TITLES[self.algorithms['d']]} "
+                                   f"({self.search_mode}, M to change speed, 1/2 to change algorithms)")
 
     # handle events like key presses and mouse clicks
     def _handle_events(self):
@@ -345,6 +1271,24 @@ class PathfindingVisualizer:
                     self._generate_new_maze()
                 elif event.key == pygame.K_c:
                     self._clear_path()
+                elif event.key == pygame.K_m:
+                    self._next_search_mode()
+                elif event.key == pygame.K_1:
+                    self._next_algorithm('a')
+                elif event.key == pygame.K_2:
+                    self._next_algorithm('d')
+            # drag with the left button to paint walls, starting on a wall erases them
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                cell = self._cell_at(event.pos)
+                if cell:
+                    self.paint_walls = not self.grid_map.is_wall(*cell)
+                    self._set_wall(*cell, self.paint_walls)
+            elif event.type == pygame.MOUSEMOTION and self.paint_walls is not None:
+                cell = self._cell_at(event.pos)
+                if cell:
+                    self._set_wall(*cell, self.paint_walls)
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                self.paint_walls = None
             for button in self.buttons:
                 button.handle_event(event)
 
@@ -353,8 +1297,198 @@ class PathfindingVisualizer:
         mouse_pos = pygame.mouse.get_pos()
         for button in self.buttons:
             button.is_hovered = button.rect.collidepoint(mouse_pos)
+        if self.searches:
+            if self.search_mode == 'animated':
+                steps = max(1, round(1000 / FPS / ANIMATION_SPEED))
+                self._advance_searches(SEARCH_BUDGET, steps)
+            else:
+                self._advance_searches(SEARCH_BUDGET)
+
+# load a moving ai .map file (type, height, width, then the rows after "map")
+def load_map(path: str) -> GridMap:
+    with open(path) as file:
+        lines = file.read().splitlines()
+    header = {}
+    line_number = 0
+    while lines[line_number].strip() != 'map':
+        key, _, value = lines[line_number].partition(' ')
+        header[key] = value.strip()
+        line_number += 1
+    rows, cols = int(header['height']), int(header['width'])
+    grid = GridMap(rows, cols)
+    for r, line in enumerate(lines[line_number + 1:line_number + 1 + rows]):
+        index = grid.index(r, 0)
+        for c, char in enumerate(line[:cols]):
+            if char not in MAP_PASSABLE:
+                grid.walls[index + c] = 1
+    return grid
+
+# load the start and goal cells, as (row, col) pairs, of a moving ai .scen file
+def load_scenarios(path: str) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    scenarios = []
+    with open(path) as file:
+        for line in file:
+            fields = line.split('\t')
+            if len(fields) < 8:
+                continue  # the "version" line
+            start_x, start_y, goal_x, goal_y = map(int, fields[4:8])
+            scenarios.append(((start_y, start_x), (goal_y, goal_x)))
+    return scenarios
+
+# benchmark queries as (name, grid, start index, end index): the seeded random
+# corpus, or the scenarios of a moving ai map. with landmarks, the alt tables of
+# the map are loaded from next to it, or built and saved there
+def benchmark_queries(sizes: List[int], densities: List[float], map_path: Optional[str] = None,
+                      scen_path: Optional[str] = None, limit: Optional[int] = None, landmarks: int = 0):
+    if map_path:
+        grid = load_map(map_path)
+        if landmarks:
+            LandmarkTable.for_map(grid, map_path, landmarks)
+        if scen_path:
+            scenarios = load_scenarios(scen_path)[:limit]
+        else:
+            scenarios = [((0, 0), (grid.rows - 1, grid.cols - 1))]
+        name = map_path.replace('\\', '/').rsplit('/', 1)[-1]
+        for number, (start, end) in enumerate(scenarios):
+            yield f"{name}#{number}", grid, grid.index(*start), grid.index(*end)
+        return
+    for size in sizes:
+        for density in densities:
+            for seed in BENCHMARK_SEEDS:
+                grid = GridMap.random(size, size, density, random.Random(seed))
+                yield f"random-{size}-{density}-{seed}", grid, grid.start, grid.end
+
+# build the preprocessing of an algorithm for a map if it isn't cached yet,
+# returns its seconds and peak memory, or None for both when nothing was built
+def run_preprocessing(grid: GridMap, name: str, measure_memory: bool = True) -> Tuple[Optional[float], Optional[int]]:
+    if name not in PREPROCESSING:
+        return None, None
+    build, cache = PREPROCESSING[name]
+    if grid in cache:
+        return None, None
+    started = time.perf_counter()
+    build(grid)
+    seconds = time.perf_counter() - started
+    peak = None
+    if measure_memory:
+        del cache[grid]
+        tracemalloc.start()
+        build(grid)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return seconds, peak
+
+# run every algorithm on every query and write the results as json. peak memory
+# is measured in a second run because tracing allocations slows the search down.
+# preprocessing (hpa* entrances, alt tables) is built before a map's first query
+# and reported in its own fields, so the query fields only hold the query itself
+def run_benchmark(names: List[str], queries, output: str, measure_memory: bool = True):
+    results = []
+    for query, grid, start, end in queries:
+        grid.start, grid.end = start, end
+        for name in names:
+            preprocess_seconds, preprocess_peak = run_preprocessing(grid, name, measure_memory)
+            path, expanded, seconds = run_search(grid, name)
+            peak = None
+            if measure_memory:
+                tracemalloc.start()
+                run_search(grid, name)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            results.append({
+                'query': query, 'rows': grid.rows, 'cols': grid.cols,
+                'start': grid.coords(start), 'goal': grid.coords(end),
+                'algorithm': name, 'expanded': expanded,
+                'length': len(path) - 1 if path else None,
+                'seconds': seconds, 'peak_bytes': peak,
+                'preprocess_seconds': preprocess_seconds, 'preprocess_peak_bytes': preprocess_peak,
+            })
+            print(f"{query:<28} {ALGORITHM_TITLES[name]:<20} {expanded:>9} expanded  "
+                  f"length {results[-1]['length'] if path else '-':>6}  {seconds:8.4f}s"
+                  + (f"  {peak / 1e6:8.2f} MB" if peak is not None else "")
+                  + (f"  (+{preprocess_seconds:.4f}s preprocessing)" if preprocess_seconds is not None else ""))
+    with open(output, 'w') as file:
+        json.dump({'python': platform.python_version(), 'results': results}, file, indent=1)
+
+    print(f"\n{'algorithm':<20} {'expanded':>12} {'seconds':>10} {'preprocessing':>14}")
+    for name in names:
+        rows = [r for r in results if r['algorithm'] == name]
+        preprocess = sum(r['preprocess_seconds'] or 0 for r in rows)
+        print(f"{ALGORITHM_TITLES[name]:<20} {sum(r['expanded'] for r in rows):>12} "
+              f"{sum(r['seconds'] for r in rows):>10.3f} {preprocess:>13.3f}s")
+    print(f"wrote {len(results)} results to {output}")
+
+# answer every scenario of a moving ai map with one loaded landmark table
+def run_batch(map_path: str, scen_path: str, limit: Optional[int] = None, count: int = LANDMARK_COUNT):
+    grid = load_map(map_path)
+    started = time.perf_counter()
+    table = LandmarkTable.for_map(grid, map_path, count)
+    loaded = time.perf_counter() - started
+    queries = [(grid.index(*start), grid.index(*end)) for start, end in load_scenarios(scen_path)[:limit]]
+    started = time.perf_counter()
+    results = table.batch(queries)
+    elapsed = time.perf_counter() - started
+    found = sum(1 for path, _ in results if path)
+    expanded = sum(count for _, count in results)
+    print(f"{len(table.landmarks)} landmarks ready in {loaded:.3f}s")
+    print(f"{len(queries)} queries, {found} paths, {expanded} expanded in {elapsed:.3f}s "
+          f"({elapsed / max(len(queries), 1) * 1000:.3f} ms per query)")
+
+# compare algorithms on a random grid without opening the window
+def compare_headless(rows: int, cols: int, density: float, seed: Optional[int], names: List[str],
+                     workers: Optional[int] = None, serial: bool = False):
+    grid = GridMap.random(rows, cols, density, random.Random(seed))
+    started = time.perf_counter()
+    if serial:
+        results = {name: run_search(grid, name) for name in names}
+    else:
+        results = compare_parallel(grid, names, workers)
+    elapsed = time.perf_counter() - started
+    print(f"{rows}x{cols} grid, {density:.0%} walls, seed {seed}")
+    for name, (path, expanded, seconds) in results.items():
+        length = len(path) - 1 if path else '-'
+        print(f"{ALGORITHM_TITLES[name]:<20} {expanded:>10} expanded  length {length:>6}  {seconds:8.3f}s")
+    print(f"total {elapsed:.3f}s, sum of searches {sum(r[2] for r in results.values()):.3f}s")
 
 # main entry point to run the visualizer
 if __name__ == "__main__":
-    visualizer = PathfindingVisualizer()
-    visualizer.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pathfinding visualizer")
+    parser.add_argument("--compare", action="store_true",
+                        help="compare algorithms on a random grid without opening the window")
+    parser.add_argument("--size", type=int, nargs=2, default=(1000, 1000), metavar=("ROWS", "COLS"))
+    parser.add_argument("--density", type=float, default=WALL_DENSITY, help="fraction of cells that are walls")
+    parser.add_argument("--seed", type=int, help="seed for the random grid")
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument("--workers", type=int, help="worker processes, one per algorithm by default")
+    parser.add_argument("--serial", action="store_true", help="run the algorithms one after another")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="run the benchmark corpus, or a moving ai map with --map, and write json results")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BENCHMARK_SIZES, help="benchmark grid sizes")
+    parser.add_argument("--densities", type=float, nargs="+", default=BENCHMARK_DENSITIES,
+                        help="benchmark wall densities")
+    parser.add_argument("--map", help="moving ai .map file to benchmark instead of random grids")
+    parser.add_argument("--scen", help="moving ai .scen file with the start and goal cells for --map")
+    parser.add_argument("--scenarios", type=int, help="only run the first N scenarios")
+    parser.add_argument("--output", default="pathfinding_benchmark.json", help="where to write benchmark results")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory measurement")
+    parser.add_argument("--batch", action="store_true",
+                        help="answer the --scen queries on --map with alt a*, keeping the landmark tables next to the map")
+    parser.add_argument("--landmarks", type=int, default=LANDMARK_COUNT, help="number of alt landmarks")
+    parser.add_argument("--cell-size", type=int, default=GRID_SIZE,
+                        help="size of a grid cell in pixels, smaller cells show bigger grids")
+    args = parser.parse_args()
+
+    if args.batch:
+        if not (args.map and args.scen):
+            parser.error("--batch needs --map and --scen")
+        run_batch(args.map, args.scen, args.scenarios, args.landmarks)
+    elif args.benchmark:
+        queries = benchmark_queries(args.sizes, args.densities, args.map, args.scen, args.scenarios,
+                                    args.landmarks if 'alt' in args.algorithms else 0)
+        run_benchmark(args.algorithms, queries, args.output, not args.no_memory)
+    elif args.compare:
+        compare_headless(*args.size, args.density, args.seed, args.algorithms, args.workers, args.serial)
+    else:
+        GRID_SIZE = args.cell_size
+        visualizer = PathfindingVisualizer()
+        visualizer.run()
\ No newline at end of file
@@ -1,9 +1,24 @@
-import pygame
 import random
 import sys
 import os
 import time
 import math
+import argparse
+import csv
+import struct
+import zlib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+
+# Headless runs (benchmarks, CI) use SDL's dummy video and audio drivers so
+# no window or sound device is needed. This has to happen before pygame.init.
+HEADLESS = "--headless" in sys.argv or "--benchmark" in sys.argv or os.environ.get("SPACE_INVADERS_HEADLESS") == "1"
+if HEADLESS:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
 from pygame import mixer
 
 # Initialize pygame
@@ -17,8 +32,37 @@ PLAYER_SIZE = 64
 ENEMY_SIZE = 64
 BULLET_SIZE = (16, 32)
 POWERUP_SIZE = 40
+SHIELD_HEALTH = 5
 SCORE_FILE = "high_scores.txt"
-FPS = 60
+FPS = 60  # Simulation ticks per second; every speed is in pixels per tick
+TICK_SECONDS = 1.0 / FPS
+MAX_TICKS_PER_FRAME = 5  # Catch-up limit after a slow frame
+RENDER_FPS = 144  # Frame cap for rendering, independent of the tick rate
+ASSET_WORKERS = 4  # Threads decoding images and sounds at startup
+IMAGE_DIRS = [os.path.join("assets", "images")]
+SOUND_DIRS = [os.path.join("assets", "sounds"), "sounds"]
+IMAGE_CACHE_DIR = os.path.join("assets", "cache")  # Pre-scaled copies of source images
+COLLISION_CELL_SIZE = 64  # Size of a broadphase grid cell in pixels
+PARTICLES_PER_EXPLOSION = 60
+MAX_PARTICLES = 10000  # Hard cap on live explosion particles, about 7 ms of update and draw
+PARTICLE_STAGES = 3  # Fade steps per particle colour, largest and brightest first
+PARTICLE_DRAG = 0.95  # Velocity kept per tick
+DIRTY_RECT_LIMIT = 400  # Past this many dirty rects a full flip is cheaper
+PROFILER_FRAMES = 3600  # Ring buffer size, one minute of frames at 60 FPS
+PROFILER_STATS_INTERVAL = 15  # Frames between percentile refreshes
+BENCHMARK_WAVE_SIZES = [5, 40, 200, 1000, 5000]
+BENCHMARK_TICKS = 600  # 10 seconds of game time per wave size
+RECORDING_MAGIC = b"SIRP"
+RECORDING_VERSION = 1
+
+# Frame profiler phases, in the column order of the ring buffer and CSV
+PROFILE_PHASES = ["update", "collisions", "render", "hud", "frame"]
+PROFILE_UPDATE, PROFILE_COLLISIONS, PROFILE_RENDER, PROFILE_HUD, PROFILE_FRAME = range(len(PROFILE_PHASES))
+
+# Player input bits, read once per tick from the keyboard or a script
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_FIRE = 4
 
 # Colors
 WHITE = (255, 255, 255)
@@ -29,6 +73,41 @@ BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
 PURPLE = (128, 0, 128)
 
+# Wave layout per difficulty. "swarm" packs hundreds to thousands of
+# invaders into a tight formation, "bullet_hell" fills the screen with enemy
+# fire and switches hits to pixel-perfect masks so near misses stay misses.
+DIFFICULTIES = {
+    "normal": {"base_wave": 5, "wave_growth": 2, "max_wave": 40,
+               "cols": 10, "y_spacing": 50, "rows_per_type": 1,
+               "fire_rate": 1.0, "enemy_bullet_speed": 3, "pixel_collisions": False},
+    "swarm": {"base_wave": 200, "wave_growth": 100, "max_wave": 1200,
+              "cols": 40, "y_spacing": 8, "rows_per_type": 10,
+              "fire_rate": 1.0, "enemy_bullet_speed": 3, "pixel_collisions": False},
+    "bullet_hell": {"base_wave": 20, "wave_growth": 4, "max_wave": 60,
+                    "cols": 12, "y_spacing": 45, "rows_per_type": 2,
+                    "fire_rate": 12.0, "enemy_bullet_speed": 4, "pixel_collisions": True},
+}
+
+# Explosion particle colours
+PARTICLE_COLORS = [(255, 230, 140), (255, 150, 40), (255, 70, 30), (255, 255, 255)]
+
+# Parallax starfield layers: (star count, scroll speed, max star size, brightness range)
+STAR_LAYERS = [
+    (50, 0.1, 1, (150, 190)),
+    (35, 0.3, 2, (190, 225)),
+    (15, 0.5, 3, (225, 255)),
+]
+
+# Screen areas the HUD draws into, repainted every frame by the renderer
+HUD_AREAS = [
+    (0, 0, 300, 80),
+    (SCREEN_WIDTH - 160, 0, 160, 170),
+    (0, SCREEN_HEIGHT - 90, 400, 90),
+]
+
+# Benchmark waves keep a fixed size and a layout that fits thousands of enemies
+BENCHMARK_LAYOUT = {"wave_growth": 0, "cols": 90, "y_spacing": 4, "rows_per_type": 10}
+
 # Create the game window
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Space Invaders")
@@ -36,21 +115,114 @@ pygame.display.set_caption("Space Invaders")
 # Create asset directories if they don't exist
 os.makedirs("assets/images", exist_ok=True)
 os.makedirs("assets/sounds", exist_ok=True)
+os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+
+
+class DummySound:
+    # Stands in for sounds that can't be found so callers never need to check
+    def play(self, loops=0):
+        pass
+    def set_volume(self, vol):
+        pass
+    def stop(self):
+        pass
+
+
+class AssetRegistry:
+    # Finds every asset file with one directory listing per folder, decodes
+    # images and sounds on a thread pool and hands out display-format
+    # surfaces. Scaled images are cached on disk keyed by the source mtime
+    # and target size, so later starts skip the decode-and-scale step.
+    def __init__(self, workers=ASSET_WORKERS):
+        self.image_files = self.scan(IMAGE_DIRS, [".png"])
+        self.sound_files = self.scan(SOUND_DIRS, [".wav", ".mp3"])
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.pending = {}
+        self.loaded = {}
+
+    def scan(self, directories, extensions):
+        # Map asset name -> path, earlier directories and extensions win
+        found = {}
+        for directory in directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for ext in extensions:
+                for entry in entries:
+                    name, entry_ext = os.path.splitext(entry.name)
+                    if entry_ext.lower() == ext and name not in found and entry.is_file():
+                        found[name] = entry.path
+        return found
+
+    def request_image(self, name, size):
+        key = ("image", name, tuple(size))
+        if key not in self.pending and key not in self.loaded and name in self.image_files:
+            self.pending[key] = self.executor.submit(self.decode_image, self.image_files[name], name, tuple(size))
+        return key
+
+    def request_sound(self, name):
+        key = ("sound", name)
+        if key not in self.pending and key not in self.loaded and name in self.sound_files:
+            self.pending[key] = self.executor.submit(mixer.Sound, self.sound_files[name])
+        return key
+
+    def decode_image(self, path, name, size):
+        # Runs on a worker thread: load the cached scaled copy if it is still
+        # current, otherwise decode, scale and refresh the cache
+        mtime = os.stat(path).st_mtime_ns
+        prefix = f"{name}_{size[0]}x{size[1]}_"
+        cache_path = os.path.join(IMAGE_CACHE_DIR, f"{prefix}{mtime}.png")
+        if os.path.exists(cache_path):
+            return pygame.image.load(cache_path)
+
+        img = pygame.transform.scale(pygame.image.load(path), size)
+        try:
+            for entry in os.scandir(IMAGE_CACHE_DIR):
+                if entry.name.startswith(prefix):
+                    os.remove(entry.path)  # Stale copy of an older source file
+            pygame.image.save(img, cache_path)
+        except (OSError, pygame.error):
+            pass
+        return img
+
+    def result(self, key):
+        if key in self.loaded:
+            return self.loaded[key]
+        future = self.pending.pop(key, None)
+        value = None
+        if future is not None:
+            try:
+                value = future.result()
+            except Exception:
+                value = None
+        self.loaded[key] = value
+        return value
+
+    def image(self, name, size, color_key=None):
+        key = self.request_image(name, size)
+        img = self.result(key)
+        if img is None:
+            return create_placeholder_image(name, size, color_key)
+        if img.get_flags() & pygame.SRCALPHA:
+            img = img.convert_alpha()
+        else:
+            img = img.convert()
+        if color_key is not None:
+            img.set_colorkey(color_key)
+        return img
+
+    def sound(self, name):
+        sound = self.result(self.request_sound(name))
+        return sound if sound is not None else DummySound()
+
 
 # Load images
 def load_image(name, size, color_key=None):
     # Try to load image from assets directory
-    try:
-        image_path = os.path.join("assets", "images", f"{name}.png")
-        if os.path.exists(image_path):
-            img = pygame.image.load(image_path)
-            img = pygame.transform.scale(img, size)
-            if color_key is not None:
-                img.set_colorkey(color_key)
-            return img
-    except:
-        pass
-    
+    return assets.image(name, size, color_key)
+
+def create_placeholder_image(name, size, color_key=None):
     # Create a placeholder if image can't be found
     surface = pygame.Surface(size)
     if name == "player":
@@ -100,34 +272,27 @@ def load_image(name, size, color_key=None):
 
 # Load sounds
 def load_sound(name):
-    # Try to load the sound from a few different potential paths
-    sound_paths = [
-        os.path.join("assets", "sounds", f"{name}.wav"),
-        os.path.join("assets", "sounds", f"{name}.mp3"),
-        os.path.join("sounds", f"{name}.wav"),
-        os.path.join("sounds", f"{name}.mp3")
-    ]
-    
-    for path in sound_paths:
-        try:
-            if os.path.exists(path):
-                sound = mixer.Sound(path)
-                return sound
-        except:
-            pass
-    
-    # Return a dummy sound object that does nothing
-    class DummySound:
-        def play(self, loops=0):
-            pass
-        def set_volume(self, vol):
-            pass
-        def stop(self):
-            pass
-
-    return DummySound()
+    # Returns a dummy sound object that does nothing if the sound is missing
+    return assets.sound(name)
 
 # Load assets
+assets = AssetRegistry()
+
+# Queue every image and sound first so they decode in parallel
+for image_name, image_size in [
+    ("player", (PLAYER_SIZE, PLAYER_SIZE)),
+    ("enemy1", (ENEMY_SIZE, ENEMY_SIZE)),
+    ("enemy2", (ENEMY_SIZE, ENEMY_SIZE)),
+    ("enemy3", (ENEMY_SIZE, ENEMY_SIZE)),
+    ("bullet", BULLET_SIZE),
+    ("background", (SCREEN_WIDTH, SCREEN_HEIGHT)),
+    ("shield", (100, 50)),
+    ("powerup", (POWERUP_SIZE, POWERUP_SIZE)),
+] + [(f"explosion{i}", (ENEMY_SIZE, ENEMY_SIZE)) for i in range(1, 4)]:
+    assets.request_image(image_name, image_size)
+for sound_name in ["shoot", "explosion", "powerup", "game_over", "background_music", "menu_music"]:
+    assets.request_sound(sound_name)
+
 player_img = load_image("player", (PLAYER_SIZE, PLAYER_SIZE), BLACK)
 enemy_img = load_image("enemy1", (ENEMY_SIZE, ENEMY_SIZE), BLACK)
 enemy2_img = load_image("enemy2", (ENEMY_SIZE, ENEMY_SIZE), BLACK)
@@ -140,6 +305,94 @@ explosion_imgs = [
     load_image(f"explosion{i}", (ENEMY_SIZE, ENEMY_SIZE), BLACK) for i in range(1, 4)
 ]
 
+POWERUP_TYPES = ["weapon", "shield", "life", "speed"]  # Added speed power-up
+
+# Build a powerup icon for the given type
+def create_powerup_image(power_type):
+    image = powerup_img.copy()
+    if power_type == "weapon":
+        image.fill(BLUE)
+        pygame.draw.circle(image, WHITE, (POWERUP_SIZE//2, POWERUP_SIZE//2), POWERUP_SIZE//4)
+    elif power_type == "shield":
+        image.fill(GREEN)
+        pygame.draw.rect(image, WHITE, (POWERUP_SIZE//4, POWERUP_SIZE//4, POWERUP_SIZE//2, POWERUP_SIZE//2), 2)
+    elif power_type == "speed":
+        image.fill(PURPLE)
+        # Draw a lightning bolt symbol
+        points = [(POWERUP_SIZE//2, 10), (20, 25), (30, 25), (20, 40)]
+        pygame.draw.lines(image, WHITE, False, points, 3)
+    else:  # life
+        image.fill(RED)
+        # Draw a heart symbol
+        pygame.draw.circle(image, WHITE, (POWERUP_SIZE//3 * 2, POWERUP_SIZE//3), POWERUP_SIZE//6)
+        pygame.draw.polygon(image, WHITE, [(POWERUP_SIZE//2, POWERUP_SIZE//3 * 2),
+                                           (10, POWERUP_SIZE//3),
+                                           (POWERUP_SIZE-10, POWERUP_SIZE//3)])
+    return image
+
+# Sprite cache: every bullet and powerup variant is rendered once here
+# instead of each time an object spawns
+enemy_bullet_img = pygame.transform.rotate(bullet_img, 180)
+enemy_bullet_img.fill(RED)
+powerup_imgs = {power_type: create_powerup_image(power_type) for power_type in POWERUP_TYPES}
+
+# Build the shield sprite for every damage state once; each lost point of
+# health fades the shield further. Indexed by remaining health.
+def create_shield_states():
+    states = [None]
+    for health in range(1, SHIELD_HEALTH + 1):
+        state = shield_img.convert_alpha()
+        alpha = int((health / SHIELD_HEALTH) * 255)
+        state.fill((255, 255, 255, alpha), None, pygame.BLEND_RGBA_MULT)
+        states.append(state)
+    return states
+
+shield_imgs = create_shield_states()
+
+# Collision masks for pixel-perfect hits, built once per sprite variant and
+# looked up by the image an object is currently showing
+def create_sprite_masks():
+    masks = {}
+    for image in [player_img, enemy_img, enemy2_img, enemy3_img, bullet_img, enemy_bullet_img]:
+        masks[image] = pygame.mask.from_surface(image)
+    for image in powerup_imgs.values():
+        masks[image] = pygame.mask.from_surface(image)
+    # Damaged shields are only faded, so every state keeps the full outline
+    shield_mask = pygame.mask.from_surface(shield_imgs[SHIELD_HEALTH])
+    for state in shield_imgs[1:]:
+        masks[state] = shield_mask
+    return masks
+
+sprite_masks = create_sprite_masks()
+
+# Narrowphase for objects whose rects already overlap: True if any opaque
+# pixels of the two sprites touch
+def masks_overlap(a, b):
+    offset = (b.rect.x - a.rect.x, b.rect.y - a.rect.y)
+    return sprite_masks[a.image].overlap(sprite_masks[b.image], offset) is not None
+
+# Small glow sprites for explosion particles, one per colour and fade stage.
+# They are drawn with additive blending, so black means "no light".
+def create_particle_sprites():
+    sprites = []
+    for color in PARTICLE_COLORS:
+        for stage in range(PARTICLE_STAGES):
+            radius = PARTICLE_STAGES - stage
+            fade = 1.0 - stage / PARTICLE_STAGES
+            sprite = pygame.Surface((radius * 2, radius * 2))
+            sprite.fill(BLACK)
+            pygame.draw.circle(sprite, [int(c * fade) for c in color], (radius, radius), radius)
+            sprites.append(sprite)
+    return sprites
+
+particle_sprites = create_particle_sprites()
+
+# Translucent bubble drawn around the player while the shield is active
+player_shield_img = pygame.Surface((PLAYER_SIZE + 20, PLAYER_SIZE + 20), pygame.SRCALPHA)
+pygame.draw.circle(player_shield_img, (0, 255, 255, 100),
+                   (PLAYER_SIZE // 2 + 10, PLAYER_SIZE // 2 + 10),
+                   PLAYER_SIZE // 2 + 10, 3)
+
 # Load sounds
 shoot_sound = load_sound("shoot")
 explosion_sound = load_sound("explosion")
@@ -155,12 +408,99 @@ game_over_sound.set_volume(0.2)
 background_music.set_volume(0.2)
 
 
+class KeyboardInput:
+    # Reads the live keyboard state as INPUT_* bits
+    def read(self):
+        keys = pygame.key.get_pressed()
+        state = 0
+        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            state |= INPUT_LEFT
+        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            state |= INPUT_RIGHT
+        if keys[pygame.K_SPACE]:
+            state |= INPUT_FIRE
+        return state
+
+
+class ScriptedInput:
+    # Plays back a fixed list of INPUT_* states, looping when it runs out
+    def __init__(self, states):
+        self.states = list(states)
+        self.index = 0
+
+    def read(self):
+        state = self.states[self.index % len(self.states)]
+        self.index += 1
+        return state
+
+
+def patrol_script(sweep_ticks=90):
+    # Sweep left and right across the screen while holding fire
+    return ScriptedInput([INPUT_LEFT | INPUT_FIRE] * sweep_ticks + [INPUT_RIGHT | INPUT_FIRE] * sweep_ticks)
+
+
+class InputRecorder:
+    # Wraps an input source and keeps every state it hands to the game.
+    # A session holds one entry per game: its seed, one byte of INPUT_* bits
+    # per tick that read input, and the final score for checking replays.
+    def __init__(self, source, difficulty):
+        self.source = source
+        self.difficulty = difficulty
+        self.games = []
+
+    def start_game(self, seed):
+        self.games.append([seed, bytearray(), None])
+
+    def end_game(self, score):
+        self.games[-1][2] = score
+
+    def read(self):
+        state = self.source.read()
+        self.games[-1][1].append(state)
+        return state
+
+    def save(self, path):
+        # Header, then the zlib-compressed games; held keys make long runs
+        # of identical bytes, so a 10 minute session is a few KB
+        body = bytearray()
+        for seed, states, score in self.games:
+            body += struct.pack("<qIq", seed, len(states), score)
+            body += states
+        name = self.difficulty.encode()
+        with open(path, "wb") as file:
+            file.write(RECORDING_MAGIC + struct.pack("<BB", RECORDING_VERSION, len(name)) + name)
+            file.write(zlib.compress(bytes(body), 9))
+
+
+def load_recording(path):
+    # Returns (difficulty, [(seed, states, final score), ...])
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[:4] != RECORDING_MAGIC:
+        raise ValueError(f"{path} is not a Space Invaders recording")
+    version, name_length = struct.unpack_from("<BB", data, 4)
+    if version != RECORDING_VERSION:
+        raise ValueError(f"Unsupported recording version {version}")
+    difficulty = data[6:6 + name_length].decode()
+    body = zlib.decompress(data[6 + name_length:])
+
+    games = []
+    offset = 0
+    while offset < len(body):
+        seed, count, score = struct.unpack_from("<qIq", body, offset)
+        offset += struct.calcsize("<qIq")
+        games.append((seed, body[offset:offset + count], score))
+        offset += count
+    return difficulty, games
+
+
 class Player:
     def __init__(self):
         self.image = player_img
         self.rect = self.image.get_rect()
         self.rect.x = SCREEN_WIDTH // 2 - PLAYER_SIZE // 2
         self.rect.y = SCREEN_HEIGHT - 100
+        self.prev_x = self.rect.x  # Position at the previous tick, for interpolation
         self.speed = 5
         self.lives = 3
         self.shoot_cooldown = 0
@@ -275,84 +615,163 @@ class Enemy:
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
-        self.direction = 1
         self.shoot_chance = 0.001 * (enemy_type + 1)
-        self.explosion_index = 0
-        self.exploding = False
-        self.explosion_timer = 0
-        # Add a float position for smoother movement
-        self.float_x = float(x)
-        self.float_y = float(y)
-        # Add a target y-position for smooth downward movement
-        self.target_y = float(y)
-        # Add entrance animation
-        self.entering = True
-        self.entrance_y = -ENEMY_SIZE
-        self.final_y = float(y)
+        # Movement state lives in the EnemySwarm arrays, this is just the
+        # entrance speed the swarm picks up when the wave is spawned
         self.entrance_speed = random.uniform(1.0, 2.0)
 
+    def hit(self):
+        self.health -= 1
+        return self.health <= 0
+
+
+
+class EnemySwarm:
+    # Struct-of-arrays store for enemy movement. Row i of every array belongs
+    # to enemies[i]; movement, edge checks and shooting are one NumPy
+    # operation per frame and enemy rects are only synced from the arrays.
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.clear()
+
+    def clear(self):
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.prev_x = np.zeros(0)
+        self.prev_y = np.zeros(0)
+        self.target_y = np.zeros(0)
+        self.final_y = np.zeros(0)
+        self.speed = np.zeros(0)
+        self.entrance_speed = np.zeros(0)
+        self.shoot_chance = np.zeros(0)
+        self.direction = np.zeros(0)
+        self.entering = np.zeros(0, dtype=bool)
+
+    def spawn(self, enemies):
+        # Load the starting state of a freshly created wave
+        self.x = np.array([e.rect.x for e in enemies], dtype=float)
+        self.y = np.array([e.rect.y for e in enemies], dtype=float)
+        self.prev_x = self.x.copy()
+        self.prev_y = self.y.copy()
+        self.target_y = self.y.copy()
+        self.final_y = self.y.copy()
+        self.speed = np.array([e.speed for e in enemies], dtype=float)
+        self.entrance_speed = np.array([e.entrance_speed for e in enemies])
+        self.shoot_chance = np.array([e.shoot_chance for e in enemies])
+        self.direction = np.ones(len(enemies))
+        self.entering = np.ones(len(enemies), dtype=bool)
+
+    def compact(self, keep):
+        # Drop the rows of destroyed enemies
+        self.x = self.x[keep]
+        self.y = self.y[keep]
+        self.prev_x = self.prev_x[keep]
+        self.prev_y = self.prev_y[keep]
+        self.target_y = self.target_y[keep]
+        self.final_y = self.final_y[keep]
+        self.speed = self.speed[keep]
+        self.entrance_speed = self.entrance_speed[keep]
+        self.shoot_chance = self.shoot_chance[keep]
+        self.direction = self.direction[keep]
+        self.entering = self.entering[keep]
+
     def move(self, speed_multiplier=1.0):
-        if self.entering:
-            # Entrance animation
-            if self.float_y < self.final_y:
-                self.float_y += self.entrance_speed
-                self.rect.y = int(self.float_y)
-            else:
-                self.entering = False
-                self.float_y = self.final_y
-                self.rect.y = int(self.float_y)
-        else:
-            # Normal movement
-            self.float_x += self.speed * self.direction * speed_multiplier
-            self.rect.x = int(self.float_x)
-            
-            # Smooth downward movement if there's a target y-position
-            if self.float_y < self.target_y:
-                # Move down smoothly
-                downward_speed = min(2.0, (self.target_y - self.float_y) / 10)
-                self.float_y += downward_speed
-                self.rect.y = int(self.float_y)
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+        entering = self.entering
+        active = ~entering
 
-    def set_target_y(self, y):
-        # Set a new target y-position
-        self.target_y = float(y)
+        # Entrance animation, finishing enemies snap to their final row
+        approaching = entering & (self.y < self.final_y)
+        self.y[approaching] += self.entrance_speed[approaching]
+        arrived = entering & ~approaching
+        self.y[arrived] = self.final_y[arrived]
 
-    def should_shoot(self):
-        return random.random() < self.shoot_chance
+        # Normal movement
+        self.x[active] += (self.speed * self.direction)[active] * speed_multiplier
 
-    def hit(self):
-        self.health -= 1
-        return self.health <= 0
+        # Smooth downward movement towards the target y-position
+        descending = active & (self.y < self.target_y)
+        step = np.minimum(2.0, (self.target_y - self.y) / 10)
+        self.y[descending] += step[descending]
+
+        self.entering = approaching
+
+    def bounce(self):
+        # Reverse and step down the formation when an enemy reaches an edge
+        rect_x = self.x.astype(int)
+        active = ~self.entering
+        at_edge = active & (((rect_x < 10) & (self.direction < 0)) |
+                            ((rect_x > SCREEN_WIDTH - ENEMY_SIZE - 10) & (self.direction > 0)))
+        if at_edge.any():
+            self.direction[active] *= -1
+            # Set a new target y-position instead of immediately moving down
+            self.target_y[active] = self.y[active] + 20
+            return True
+        return False
 
-    def explode(self):
-        if not self.exploding:
-            self.exploding = True
-            explosion_sound.play()
+    def lowest_y(self):
+        return int(self.y.max()) if len(self.y) else 0
 
-        self.explosion_timer += 1
-        if self.explosion_timer > 5:
-            self.explosion_index += 1
-            self.explosion_timer = 0
+    def shooters(self):
+        # Roll every enemy's shot chance at once
+        rolls = self.rng.random(len(self.x))
+        return np.flatnonzero(~self.entering & (rolls < self.shoot_chance))
 
-        if self.explosion_index < len(explosion_imgs):
-            return explosion_imgs[self.explosion_index]
-        return None
+    def positions(self, alpha):
+        # Screen positions blended between the last two ticks
+        xs = (self.prev_x + (self.x - self.prev_x) * alpha).astype(int).tolist()
+        ys = (self.prev_y + (self.y - self.prev_y) * alpha).astype(int).tolist()
+        return zip(xs, ys)
+
+    def sync_rects(self, enemies):
+        for enemy, x, y in zip(enemies, self.x.astype(int).tolist(), self.y.astype(int).tolist()):
+            enemy.rect.x = x
+            enemy.rect.y = y
+
+
+class ObjectPool:
+    # Recycles instances of a class with a reset() method instead of
+    # allocating a new object every time one spawns
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.live = 0
+
+    def acquire(self, *args):
+        self.live += 1
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            return obj
+        return self.cls(*args)
+
+    def release(self, obj):
+        self.live -= 1
+        self.free.append(obj)
+
+    def release_all(self, objects):
+        self.live -= len(objects)
+        self.free.extend(objects)
 
 
 class Bullet:
+    __slots__ = ("enemy_bullet", "image", "rect", "speed", "prev_y")
+
     def __init__(self, x, y, speed=7, enemy_bullet=False):
+        self.rect = bullet_img.get_rect()
+        self.reset(x, y, speed, enemy_bullet)
+
+    def reset(self, x, y, speed=7, enemy_bullet=False):
         self.enemy_bullet = enemy_bullet
-        if enemy_bullet:
-            self.image = pygame.transform.rotate(bullet_img, 180)
-            self.image.fill(RED)
-        else:
-            self.image = bullet_img
-        self.rect = self.image.get_rect()
+        self.image = enemy_bullet_img if enemy_bullet else bullet_img
         self.rect.x = x
         self.rect.y = y
+        self.prev_y = y
         self.speed = speed
 
     def move(self):
+        self.prev_y = self.rect.y
         if self.enemy_bullet:
             self.rect.y += self.speed
         else:
@@ -360,62 +779,377 @@ class Bullet:
 
 
 class Powerup:
+    __slots__ = ("type", "image", "rect", "speed", "prev_y")
+
     def __init__(self, x, y):
-        self.types = ["weapon", "shield", "life", "speed"]  # Added speed power-up
-        self.type = random.choice(self.types)
-
-        # Create a new image based on the powerup type
-        self.image = powerup_img.copy()
-        if self.type == "weapon":
-            self.image.fill(BLUE)
-            pygame.draw.circle(self.image, WHITE, (POWERUP_SIZE//2, POWERUP_SIZE//2), POWERUP_SIZE//4)
-        elif self.type == "shield":
-            self.image.fill(GREEN)
-            pygame.draw.rect(self.image, WHITE, (POWERUP_SIZE//4, POWERUP_SIZE//4, POWERUP_SIZE//2, POWERUP_SIZE//2), 2)
-        elif self.type == "speed":
-            self.image.fill(PURPLE)
-            # Draw a lightning bolt symbol
-            points = [(POWERUP_SIZE//2, 10), (20, 25), (30, 25), (20, 40)]
-            pygame.draw.lines(self.image, WHITE, False, points, 3)
-        else:  # life
-            self.image.fill(RED)
-            # Draw a heart symbol
-            pygame.draw.circle(self.image, WHITE, (POWERUP_SIZE//3 * 2, POWERUP_SIZE//3), POWERUP_SIZE//6)
-            pygame.draw.polygon(self.image, WHITE, [(POWERUP_SIZE//2, POWERUP_SIZE//3 * 2), 
-                                                  (10, POWERUP_SIZE//3), 
-                                                  (POWERUP_SIZE-10, POWERUP_SIZE//3)])
+        self.rect = pygame.Rect(0, 0, POWERUP_SIZE, POWERUP_SIZE)
+        self.reset(x, y)
 
-        self.rect = self.image.get_rect()
+    def reset(self, x, y):
+        self.type = random.choice(POWERUP_TYPES)
+        # Use the pre-rendered icon for this powerup type
+        self.image = powerup_imgs[self.type]
         self.rect.x = x
         self.rect.y = y
+        self.prev_y = y
         self.speed = 2
-        
+
     def move(self):
+        self.prev_y = self.rect.y
         self.rect.y += self.speed
 
 
+class Explosion:
+    __slots__ = ("rect", "index", "timer")
+
+    def __init__(self, x, y):
+        self.rect = pygame.Rect(0, 0, ENEMY_SIZE, ENEMY_SIZE)
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        self.rect.x = x
+        self.rect.y = y
+        self.index = 0
+        self.timer = 0
+
+    def update(self):
+        # Advance the animation, returns False once the last frame has played
+        self.timer += 1
+        if self.timer > 5:
+            self.index += 1
+            self.timer = 0
+        return self.index < len(explosion_imgs)
+
+    @property
+    def image(self):
+        return explosion_imgs[self.index]
+
+
+# Shared pools so objects are recycled across waves and restarts
+bullet_pool = ObjectPool(Bullet)
+powerup_pool = ObjectPool(Powerup)
+explosion_pool = ObjectPool(Explosion)
+
+
 class Shield:
     def __init__(self, x, y):
-        self.image = shield_img
+        self.health = SHIELD_HEALTH
+        self.image = shield_imgs[self.health]
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
-        self.health = 5
         
     def hit(self):
         self.health -= 1
-        # Change the shield transparency based on health
-        alpha = int((self.health / 5) * 255)
-        temp_shield = self.image.copy()
-        temp_shield.fill((255, 255, 255, alpha), None, pygame.BLEND_RGBA_MULT)
-        self.image = temp_shield
+        # Switch to the pre-built sprite for the new damage state
+        if self.health > 0:
+            self.image = shield_imgs[self.health]
         return self.health <= 0
 
 
+class SpatialHash:
+    # Uniform grid broadphase: every object is bucketed into the cells its rect
+    # overlaps, so a query only has to look at objects sharing a cell with it
+    def __init__(self, cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return (rect.left // size, (rect.right - 1) // size,
+                rect.top // size, (rect.bottom - 1) // size)
+
+    def insert_all(self, layer, objects):
+        # Register a whole list at once; the list index is kept so query
+        # results come back in the same order as the original list
+        cells = self.cells
+        for index, obj in enumerate(objects):
+            x0, x1, y0, y1 = self.cell_range(obj.rect)
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    key = (layer, cx, cy)
+                    bucket = cells.get(key)
+                    if bucket is None:
+                        cells[key] = [(index, obj)]
+                    else:
+                        bucket.append((index, obj))
+
+    def query(self, layer, rect):
+        # Narrowphase: only objects sharing a cell with rect are tested
+        candidates = {}
+        cells = self.cells
+        x0, x1, y0, y1 = self.cell_range(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((layer, cx, cy))
+                if bucket:
+                    candidates.update(bucket)
+        return [candidates[index] for index in sorted(candidates)
+                if rect.colliderect(candidates[index].rect)]
+
+
+class ParticleSystem:
+    # Explosion particles stored as NumPy arrays. New bursts are queued and
+    # added in one batch per tick, and every particle is moved, aged and
+    # culled together.
+    def __init__(self, seed=None, capacity=MAX_PARTICLES):
+        self.rng = np.random.default_rng(seed)
+        self.capacity = capacity
+        self.pos = np.zeros((0, 2))
+        self.vel = np.zeros((0, 2))
+        self.life = np.zeros(0)
+        self.max_life = np.zeros(0)
+        self.color = np.zeros(0, dtype=int)
+        self.pending = []
+
+    def __len__(self):
+        return len(self.life)
+
+    def emit(self, x, y, count=PARTICLES_PER_EXPLOSION):
+        self.pending.append((x, y, count))
+
+    def flush(self):
+        # Spawn every queued burst at once, dropping what doesn't fit
+        room = self.capacity - len(self.life)
+        origins = []
+        for x, y, count in self.pending:
+            count = min(count, room)
+            if count <= 0:
+                break
+            origins.append(np.tile((float(x), float(y)), (count, 1)))
+            room -= count
+        self.pending = []
+        if not origins:
+            return
+
+        pos = np.concatenate(origins)
+        count = len(pos)
+        rng = self.rng
+        angle = rng.uniform(0, 2 * math.pi, count)
+        speed = rng.uniform(0.5, 4.0, count)
+        life = rng.integers(20, 50, count).astype(float)
+        self.pos = np.concatenate((self.pos, pos))
+        self.vel = np.concatenate((self.vel, np.column_stack((np.cos(angle) * speed, np.sin(angle) * speed))))
+        self.life = np.concatenate((self.life, life))
+        self.max_life = np.concatenate((self.max_life, life))
+        self.color = np.concatenate((self.color, rng.integers(0, len(PARTICLE_COLORS), count)))
+
+    def update(self):
+        if self.pending:
+            self.flush()
+        if not len(self.life):
+            return
+        self.vel *= PARTICLE_DRAG
+        self.pos += self.vel
+        self.life -= 1
+
+        # Cull dead particles in one compaction
+        alive = self.life > 0
+        if not alive.all():
+            self.pos = self.pos[alive]
+            self.vel = self.vel[alive]
+            self.life = self.life[alive]
+            self.max_life = self.max_life[alive]
+            self.color = self.color[alive]
+
+    def draw(self, target, alpha=1.0):
+        # Additively blit every particle in a single blits() call and return
+        # the rect they cover, or None if there is nothing to draw
+        if not len(self.life):
+            return None
+        pos = (self.pos - self.vel * (1.0 - alpha) - PARTICLE_STAGES).astype(int)
+        stage = np.minimum(((1.0 - self.life / self.max_life) * PARTICLE_STAGES).astype(int), PARTICLE_STAGES - 1)
+        sprite_ids = self.color * PARTICLE_STAGES + stage
+        # Feed blits() lazily; building a list of tuples first costs more than the blitting
+        target.blits(zip(map(particle_sprites.__getitem__, sprite_ids.tolist()), pos.tolist(),
+                         repeat(None), repeat(pygame.BLEND_ADD)), doreturn=False)
+        left, top = pos.min(axis=0).tolist()
+        right, bottom = pos.max(axis=0).tolist()
+        return pygame.Rect(left, top, right - left + PARTICLE_STAGES * 2, bottom - top + PARTICLE_STAGES * 2)
+
+
+class StarLayer:
+    # One pre-rendered layer of the parallax starfield. The layer scrolls by
+    # blitting it with a vertical offset that wraps around the screen.
+    def __init__(self, count, speed, max_size, brightness):
+        self.surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.surface.set_colorkey(BLACK)
+        self.star_rects = []
+        for _ in range(count):
+            x = random.randint(0, SCREEN_WIDTH)
+            y = random.randint(0, SCREEN_HEIGHT)
+            size = random.randint(1, max_size)
+            level = random.randint(*brightness)
+            self.star_rects.append(pygame.draw.circle(self.surface, (level, level, level), (x, y), size))
+        self.speed = speed
+        self.offset = 0.0
+        self.shift = 0  # Whole-pixel offset currently on screen
+
+    def update(self):
+        self.offset = (self.offset + self.speed) % SCREEN_HEIGHT
+
+    def moved(self):
+        return int(self.offset) != self.shift
+
+    def star_areas(self, shift):
+        # Screen rects covered by this layer's stars at the given offset
+        areas = []
+        for rect in self.star_rects:
+            moved = rect.move(0, (rect.y + shift) % SCREEN_HEIGHT - rect.y)
+            areas.append(moved)
+            if moved.bottom > SCREEN_HEIGHT:
+                areas.append(moved.move(0, -SCREEN_HEIGHT))
+        return areas
+
+    def draw(self, target, area):
+        # Blit the part of the layer under area, wrapping at the bottom edge
+        src_y = (area.y - self.shift) % SCREEN_HEIGHT
+        first = min(area.height, SCREEN_HEIGHT - src_y)
+        target.blit(self.surface, area.topleft, (area.x, src_y, area.width, first))
+        if first < area.height:
+            target.blit(self.surface, (area.x, area.y + first), (area.x, 0, area.width, area.height - first))
+
+
+class Renderer:
+    # Dirty-rectangle renderer. Each frame only the background under last
+    # frame's sprites, moved stars and the HUD is repainted, and only those
+    # areas plus the new sprite rects are pushed with display.update.
+    def __init__(self, star_layers):
+        self.star_layers = star_layers
+        self.screen_rect = screen.get_rect()
+        # Opaque copy of the background so restoring an area always clears it
+        self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.background.fill(BLACK)
+        self.background.blit(background_img, (0, 0))
+        self.hud_areas = [pygame.Rect(area) for area in HUD_AREAS]
+        self.previous = []
+        self.current = []
+        self.dirty = []
+        self.full_redraw = True
+
+    def invalidate(self):
+        # Repaint and flip the whole screen on the next frame
+        self.full_redraw = True
+
+    def restore(self, area):
+        # Repaint the background and starfield under area
+        screen.blit(self.background, area.topleft, area)
+        for layer in self.star_layers:
+            layer.draw(screen, area)
+
+    def begin_frame(self):
+        if not self.full_redraw:
+            dirty = self.previous + self.hud_areas
+            for layer in self.star_layers:
+                if layer.moved():
+                    dirty += layer.star_areas(layer.shift)
+                    layer.shift = int(layer.offset)
+                    dirty += layer.star_areas(layer.shift)
+            if len(dirty) > DIRTY_RECT_LIMIT:
+                # Restoring that many rects one by one costs more than
+                # repainting and flipping the whole screen once
+                self.full_redraw = True
+            else:
+                self.dirty = [rect.clip(self.screen_rect) for rect in dirty]
+                for rect in self.dirty:
+                    if rect.width and rect.height:
+                        self.restore(rect)
+        if self.full_redraw:
+            for layer in self.star_layers:
+                layer.shift = int(layer.offset)
+            self.restore(self.screen_rect)
+            self.dirty = []
+        self.current = []
+
+    def blit(self, image, position):
+        self.current.append(screen.blit(image, position))
+
+    def add_dirty(self, rect):
+        # Mark an area drawn without going through blit()
+        rect = rect.clip(self.screen_rect)
+        if rect.width and rect.height:
+            self.current.append(rect)
+
+    def present(self):
+        rects = self.dirty + self.current
+        if self.full_redraw or len(rects) > DIRTY_RECT_LIMIT:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        self.previous = self.current
+        self.full_redraw = False
+
+
+class FrameProfiler:
+    # Per-phase frame timings in perf_counter_ns, kept in a fixed-size ring
+    # buffer. "frame" is the wall time between frames, including the wait
+    # for the frame cap, so stutters show up even when no phase is slow.
+    def __init__(self, size=PROFILER_FRAMES):
+        self.samples = np.zeros((size, len(PROFILE_PHASES)), dtype=np.int64)
+        self.current = [0] * len(PROFILE_PHASES)
+        self.index = 0
+        self.count = 0
+        self.frame_start = time.perf_counter_ns()
+        self.show_overlay = True
+        self.stats = None
+        self.stats_age = 0
+
+    def add(self, phase, elapsed):
+        self.current[phase] += elapsed
+
+    def end_frame(self):
+        now = time.perf_counter_ns()
+        self.current[PROFILE_FRAME] = now - self.frame_start
+        self.frame_start = now
+        self.samples[self.index] = self.current
+        self.index = (self.index + 1) % len(self.samples)
+        self.count = min(self.count + 1, len(self.samples))
+        self.current = [0] * len(PROFILE_PHASES)
+        self.stats_age += 1
+
+    def frames(self):
+        # Recorded frames, oldest first
+        if self.count < len(self.samples):
+            return self.samples[:self.count]
+        return np.roll(self.samples, -self.index, axis=0)
+
+    def percentiles(self):
+        # p50/p95/p99 in milliseconds per phase, refreshed every few frames
+        if self.count and (self.stats is None or self.stats_age >= PROFILER_STATS_INTERVAL):
+            self.stats = np.percentile(self.frames(), [50, 95, 99], axis=0).T / 1e6
+            self.stats_age = 0
+        return self.stats
+
+    def dump_csv(self, path):
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame"] + [f"{phase}_ms" for phase in PROFILE_PHASES])
+            for i, row in enumerate(self.frames().tolist()):
+                writer.writerow([i] + [f"{ns / 1e6:.4f}" for ns in row])
+
+
 class Game:
-    def __init__(self):
+    def __init__(self, difficulty="normal", seed=None, input_source=None, profiler=None):
+        # Every game runs from a seed so it can be recorded and replayed;
+        # without one a fresh seed is picked
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        random.seed(seed)
+        self.seed = seed
+        self.difficulty = difficulty
+        self.settings = dict(DIFFICULTIES[difficulty])
+        self.pixel_collisions = self.settings["pixel_collisions"]
+        self.input_source = input_source or KeyboardInput()
+        self.tick = 0
+        self.phase_times = None  # Per-phase nanoseconds, only collected when set to a dict
+        self.profiler = profiler  # FrameProfiler, None when profiling is off
         self.player = Player()
         self.enemies = []
+        self.swarm = EnemySwarm(seed)
+        self.enemies_destroyed = False
         self.bullets = []
         self.enemy_bullets = []
         self.powerups = []
@@ -426,8 +1160,12 @@ class Game:
         self.enemy_speed_multiplier = 1.0
         self.game_over = False
         self.pause = False
-        self.explosion_particles = []
-        self.stars = self.create_starfield()
+        self.explosions = []
+        self.explosion_particles = ParticleSystem(None if seed is None else seed + 1)
+        self.show_pool_stats = False
+        self.collision_grid = SpatialHash()
+        self.star_layers = self.create_starfield()
+        self.renderer = Renderer(self.star_layers)
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
@@ -447,40 +1185,30 @@ class Game:
         self.shields = [Shield(x, y) for x, y in shield_positions]
     
     def create_starfield(self):
-        # Create a starfield for the background
-        stars = []
-        for _ in range(100):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT)
-            size = random.randint(1, 3)
-            speed = random.uniform(0.1, 0.5)
-            brightness = random.randint(150, 255)
-            color = (brightness, brightness, brightness)
-            stars.append([x, y, size, speed, color])
-        return stars
+        # Bake the starfield into a few parallax layers
+        return [StarLayer(*layer) for layer in STAR_LAYERS]
     
     def update_starfield(self):
-        # Move the stars down to create parallax scrolling effect
-        for star in self.stars:
-            star[1] += star[3]  # Move by speed
-            if star[1] > SCREEN_HEIGHT:
-                star[1] = 0
-                star[0] = random.randint(0, SCREEN_WIDTH)
+        # Scroll the layers down to create parallax scrolling effect
+        for layer in self.star_layers:
+            layer.update()
     
     def spawn_enemies(self):
         # Only spawn enemies if there are none left
         if not self.enemies:
+            settings = self.settings
+
             # Increase difficulty with each wave
-            self.wave_size = min(40, 5 + self.level * 2)
+            self.wave_size = min(settings["max_wave"], settings["base_wave"] + self.level * settings["wave_growth"])
             self.enemy_speed_multiplier = 1.0 + (self.level * 0.1)
             
             # Calculate grid size for enemies
-            cols = min(10, self.wave_size)
+            cols = min(settings["cols"], self.wave_size)
             rows = (self.wave_size + cols - 1) // cols  # Ceiling division
             
             # Calculate spacing
             x_spacing = (SCREEN_WIDTH - 100) // cols
-            y_spacing = 50
+            y_spacing = settings["y_spacing"]
             
             # Create enemies in a grid formation
             for i in range(self.wave_size):
@@ -490,144 +1218,186 @@ class Game:
                 y = 50 + row * y_spacing
                 
                 # Determine enemy type based on row
-                enemy_type = 0  # Default type
-                if row >= 2:
-                    enemy_type = 2
-                elif row >= 1:
-                    enemy_type = 1
+                enemy_type = min(2, row // settings["rows_per_type"])
                 
-                self.enemies.append(Enemy(x, y, enemy_type))
+                enemy = Enemy(x, y, enemy_type)
+                enemy.shoot_chance *= settings["fire_rate"]
+                self.enemies.append(enemy)
             
+            self.swarm.spawn(self.enemies)
+
             # Increase level
             self.level += 1
     
     def spawn_powerup(self, x, y):
         if random.random() < 0.2:  # 20% chance to spawn a power-up
-            self.powerups.append(Powerup(x, y))
+            self.powerups.append(powerup_pool.acquire(x, y))
+
+    def destroy_enemy(self, enemy):
+        # Replace a dead enemy with a pooled explosion animation
+        self.explosions.append(explosion_pool.acquire(enemy.rect.x, enemy.rect.y))
+        self.explosion_particles.emit(enemy.rect.centerx, enemy.rect.centery)
+        explosion_sound.play()
+        self.enemies_destroyed = True
+
+    def remove_destroyed_enemies(self):
+        # Drop dead enemies from the list and the swarm arrays together
+        if self.enemies_destroyed:
+            keep = np.fromiter((e.health > 0 for e in self.enemies), dtype=bool, count=len(self.enemies))
+            self.swarm.compact(keep)
+            self.enemies[:] = [e for e in self.enemies if e.health > 0]
+            self.enemies_destroyed = False
+
+    def sweep(self, objects, pool, keep):
+        # Compact a list in one pass, handing dropped objects back to their pool
+        kept = []
+        dropped = []
+        for obj in objects:
+            (kept if keep(obj) else dropped).append(obj)
+        if dropped:
+            objects[:] = kept
+            pool.release_all(dropped)
+
+    def recycle_objects(self):
+        # Return every pooled object this game still holds
+        bullet_pool.release_all(self.bullets)
+        bullet_pool.release_all(self.enemy_bullets)
+        powerup_pool.release_all(self.powerups)
+        explosion_pool.release_all(self.explosions)
+        self.bullets = []
+        self.enemy_bullets = []
+        self.powerups = []
+        self.explosions = []
     
+    def collide(self, layer, obj):
+        # Grid and rect broadphase first; in pixel-perfect mode only the
+        # pairs that survive it pay for a mask test
+        hits = self.collision_grid.query(layer, obj.rect)
+        if self.pixel_collisions and hits:
+            hits = [other for other in hits if masks_overlap(obj, other)]
+        return hits
+
     def check_collisions(self):
+        # Register this tick's targets in the broadphase grid. Player bullets
+        # are only ever the querying side, so they don't need to be registered.
+        grid = self.collision_grid
+        grid.clear()
+        grid.insert_all("enemies", self.enemies)
+        grid.insert_all("shields", self.shields)
+        grid.insert_all("enemy_bullets", self.enemy_bullets)
+        grid.insert_all("powerups", self.powerups)
+
+        # Objects consumed this tick, swept out in one pass at the end
+        spent_bullets = set()
+        spent_enemy_bullets = set()
+
         # Check player bullet collisions with enemies
-        for bullet in self.bullets[:]:
+        for bullet in self.bullets:
             hit = False
-            for enemy in self.enemies[:]:
-                if bullet.rect.colliderect(enemy.rect):
-                    if enemy.hit():
-                        # Check if the enemy should drop a power-up
-                        self.spawn_powerup(enemy.rect.x, enemy.rect.y)
-                        # Add to score
-                        self.score += enemy.score_value
-                        # Start enemy explosion animation
-                        enemy.explode()
-                    # Remove bullet regardless
-                    self.bullets.remove(bullet)
-                    hit = True
-                    break
-            
+            for enemy in self.collide("enemies", bullet):
+                if enemy.health <= 0:
+                    continue  # Already destroyed earlier this tick
+                if enemy.hit():
+                    # Check if the enemy should drop a power-up
+                    self.spawn_powerup(enemy.rect.x, enemy.rect.y)
+                    # Add to score
+                    self.score += enemy.score_value
+                    # Start enemy explosion animation
+                    self.destroy_enemy(enemy)
+                # Remove bullet regardless
+                hit = True
+                break
+
             # Check for shield collisions
             if not hit:
-                for shield in self.shields[:]:
-                    if bullet.rect.colliderect(shield.rect):
-                        if shield.hit():
-                            self.shields.remove(shield)
-                        self.bullets.remove(bullet)
-                        hit = True
-                        break
-            
-            # Remove bullets that leave the screen
-            if not hit and bullet.rect.y < -BULLET_SIZE[1]:
-                self.bullets.remove(bullet)
-        
-        # Check enemy bullet collisions with player and shields
-        for bullet in self.enemy_bullets[:]:
-            # Check for player collision
-            if bullet.rect.colliderect(self.player.rect) and self.player.visible:
+                for shield in self.collide("shields", bullet):
+                    if shield.health <= 0:
+                        continue  # Already destroyed earlier this tick
+                    shield.hit()
+                    hit = True
+                    break
+
+            # Remove bullets that hit something or leave the screen
+            if hit or bullet.rect.y < -BULLET_SIZE[1]:
+                spent_bullets.add(id(bullet))
+
+        # Check enemy bullet collisions with player
+        if self.player.visible:
+            for bullet in self.collide("enemy_bullets", self.player):
                 if self.player.hit():
                     self.game_over = True
                     game_over_sound.play()
-                self.enemy_bullets.remove(bullet)
+                spent_enemy_bullets.add(id(bullet))
+
+        # Check enemy bullet collisions with shields
+        for bullet in self.enemy_bullets:
+            if id(bullet) in spent_enemy_bullets:
                 continue
-            
-            # Check for shield collisions
+
             hit_shield = False
-            for shield in self.shields[:]:
-                if bullet.rect.colliderect(shield.rect):
-                    if shield.hit():
-                        self.shields.remove(shield)
-                    self.enemy_bullets.remove(bullet)
-                    hit_shield = True
-                    break
-            
-            if hit_shield:
-                continue
-            
-            # Remove bullets that leave the screen
-            if bullet.rect.y > SCREEN_HEIGHT:
-                self.enemy_bullets.remove(bullet)
-        
+            for shield in self.collide("shields", bullet):
+                if shield.health <= 0:
+                    continue
+                shield.hit()
+                hit_shield = True
+                break
+
+            # Remove bullets that hit a shield or leave the screen
+            if hit_shield or bullet.rect.y > SCREEN_HEIGHT:
+                spent_enemy_bullets.add(id(bullet))
+
         # Check player collisions with powerups
-        for powerup in self.powerups[:]:
-            if self.player.rect.colliderect(powerup.rect):
-                self.player.power_up(powerup.type)
-                self.powerups.remove(powerup)
-        
+        collected = self.collide("powerups", self.player)
+        for powerup in collected:
+            self.player.power_up(powerup.type)
+
         # Check player collisions with enemies
         if not self.player.invincible:
-            for enemy in self.enemies:
-                if self.player.rect.colliderect(enemy.rect):
-                    if self.player.hit():
-                        self.game_over = True
-                        game_over_sound.play()
-                    enemy.hit()  # Enemy is also damaged when hitting the player
+            for enemy in self.collide("enemies", self.player):
+                if enemy.health <= 0:
+                    continue
+                if self.player.hit():
+                    self.game_over = True
+                    game_over_sound.play()
+                # Enemy is also damaged when hitting the player
+                if enemy.hit():
+                    self.destroy_enemy(enemy)
+
+        # Compact every list once instead of removing items one by one
+        if spent_bullets:
+            self.sweep(self.bullets, bullet_pool, lambda b: id(b) not in spent_bullets)
+        if spent_enemy_bullets:
+            self.sweep(self.enemy_bullets, bullet_pool, lambda b: id(b) not in spent_enemy_bullets)
+        if collected:
+            collected = set(map(id, collected))
+            self.sweep(self.powerups, powerup_pool, lambda p: id(p) not in collected)
+        self.remove_destroyed_enemies()
+        self.shields[:] = [s for s in self.shields if s.health > 0]
     
     def check_enemy_movement(self):
-        # Check if any enemy has reached the edge of the screen
-        change_direction = False
-        move_down = False
-        
-        for enemy in self.enemies:
-            if enemy.entering:
-                continue  # Skip enemies that are still in entrance animation
-                
-            if enemy.rect.x < 10 and enemy.direction < 0:
-                change_direction = True
-                move_down = True
-                break
-            if enemy.rect.x > SCREEN_WIDTH - ENEMY_SIZE - 10 and enemy.direction > 0:
-                change_direction = True
-                move_down = True
-                break
-        
-        if change_direction:
-            for enemy in self.enemies:
-                if enemy.entering:
-                    continue
-                enemy.direction *= -1
-                if move_down:
-                    # Set a new target y-position instead of immediately moving down
-                    enemy.set_target_y(enemy.float_y + 20)
+        # Reverse the formation if any enemy has reached the edge of the screen
+        self.swarm.bounce()
         
         # Check if any enemy has reached the bottom of the screen
-        for enemy in self.enemies:
-            if enemy.rect.y > SCREEN_HEIGHT - 100:
-                self.game_over = True
-                game_over_sound.play()
-                break
+        if self.swarm.lowest_y() > SCREEN_HEIGHT - 100:
+            self.game_over = True
+            game_over_sound.play()
     
     def process_input(self):
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        state = self.input_source.read()
+        if state & INPUT_LEFT:
             self.player.move(-1)
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        if state & INPUT_RIGHT:
             self.player.move(1)
         
         # Space to shoot
-        if keys[pygame.K_SPACE] and self.player.shoot_cooldown <= 0:
+        if state & INPUT_FIRE and self.player.shoot_cooldown <= 0:
             self.shoot()
         
         # Dash ability (double tap)
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        if state & INPUT_LEFT:
             self.player.dash(-1)
-        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        elif state & INPUT_RIGHT:
             self.player.dash(1)
     
     def shoot(self):
@@ -636,15 +1406,15 @@ class Game:
             # Single bullet
             x = self.player.rect.x + PLAYER_SIZE // 2 - BULLET_SIZE[0] // 2
             y = self.player.rect.y
-            self.bullets.append(Bullet(x, y))
+            self.bullets.append(bullet_pool.acquire(x, y))
             self.player.shoot_cooldown = self.player.cooldown_time
         elif self.player.power_level == 2:
             # Double bullets
             x1 = self.player.rect.x + PLAYER_SIZE // 4 - BULLET_SIZE[0] // 2
             x2 = self.player.rect.x + PLAYER_SIZE * 3 // 4 - BULLET_SIZE[0] // 2
             y = self.player.rect.y
-            self.bullets.append(Bullet(x1, y))
-            self.bullets.append(Bullet(x2, y))
+            self.bullets.append(bullet_pool.acquire(x1, y))
+            self.bullets.append(bullet_pool.acquire(x2, y))
             self.player.shoot_cooldown = self.player.cooldown_time
         else:  # power_level >= 3
             # Triple bullets
@@ -652,31 +1422,63 @@ class Game:
             x2 = self.player.rect.x + PLAYER_SIZE // 4 - BULLET_SIZE[0] // 2
             x3 = self.player.rect.x + PLAYER_SIZE * 3 // 4 - BULLET_SIZE[0] // 2
             y = self.player.rect.y
-            self.bullets.append(Bullet(x1, y))
-            self.bullets.append(Bullet(x2, y))
-            self.bullets.append(Bullet(x3, y))
+            self.bullets.append(bullet_pool.acquire(x1, y))
+            self.bullets.append(bullet_pool.acquire(x2, y))
+            self.bullets.append(bullet_pool.acquire(x3, y))
             self.player.shoot_cooldown = self.player.cooldown_time - 10  # Faster shooting
         
         shoot_sound.play()
     
     def enemy_shoot(self):
         # Allow enemies to shoot randomly
-        for enemy in self.enemies:
-            if not enemy.entering and enemy.should_shoot():
-                x = enemy.rect.x + ENEMY_SIZE // 2 - BULLET_SIZE[0] // 2
-                y = enemy.rect.y + ENEMY_SIZE
-                self.enemy_bullets.append(Bullet(x, y, 3, True))
+        for i in self.swarm.shooters().tolist():
+            enemy = self.enemies[i]
+            x = enemy.rect.x + ENEMY_SIZE // 2 - BULLET_SIZE[0] // 2
+            y = enemy.rect.y + ENEMY_SIZE
+            self.enemy_bullets.append(bullet_pool.acquire(x, y, self.settings["enemy_bullet_speed"], True))
     
+    def step(self):
+        # Advance the simulation by one fixed timestep (1 / FPS of game time)
+        self.player.prev_x = self.player.rect.x
+        if not self.game_over and not self.pause:
+            self.process_input()
+        self.update()
+        self.tick += 1
+
     def update(self):
         if self.game_over or self.pause:
             return
         
+        phase_times = self.phase_times
+        profiler = self.profiler
+        if phase_times is None and profiler is None:
+            self.spawn_phase()
+            self.move_phase()
+            self.enemy_shoot()
+            self.check_collisions()
+            return
+        
+        # Same phases, timed for the benchmark and the frame profiler
+        for name, phase, profile_phase in (("spawn", self.spawn_phase, PROFILE_UPDATE),
+                                           ("move", self.move_phase, PROFILE_UPDATE),
+                                           ("shoot", self.enemy_shoot, PROFILE_UPDATE),
+                                           ("collisions", self.check_collisions, PROFILE_COLLISIONS)):
+            start = time.perf_counter_ns()
+            phase()
+            elapsed = time.perf_counter_ns() - start
+            if phase_times is not None:
+                phase_times[name] = phase_times.get(name, 0) + elapsed
+            if profiler is not None:
+                profiler.add(profile_phase, elapsed)
+    
+    def spawn_phase(self):
         # Update player
         self.player.update()
         
         # Spawn enemies if needed
         self.spawn_enemies()
-        
+    
+    def move_phase(self):
         # Update all game objects
         for bullet in self.bullets:
             bullet.move()
@@ -684,82 +1486,94 @@ class Game:
         for bullet in self.enemy_bullets:
             bullet.move()
         
-        # Update enemies and handle explosions
-        for enemy in self.enemies[:]:
-            if enemy.exploding:
-                # Update explosion animation
-                explosion_img = enemy.explode()
-                if explosion_img is None:
-                    self.enemies.remove(enemy)
-            else:
-                enemy.move(self.enemy_speed_multiplier)
-        
-        # Allow enemies to shoot
-        self.enemy_shoot()
+        # Update enemies
+        self.swarm.move(self.enemy_speed_multiplier)
+        self.swarm.sync_rects(self.enemies)
         
         # Check enemy movement patterns
         self.check_enemy_movement()
+
+        # Advance explosion animations, recycling the finished ones
+        self.sweep(self.explosions, explosion_pool, Explosion.update)
+        self.explosion_particles.update()
         
         # Update powerups
-        for powerup in self.powerups[:]:
+        for powerup in self.powerups:
             powerup.move()
-            # Remove powerups that leave the screen
-            if powerup.rect.y > SCREEN_HEIGHT:
-                self.powerups.remove(powerup)
+        # Remove powerups that leave the screen
+        self.sweep(self.powerups, powerup_pool, lambda p: p.rect.y <= SCREEN_HEIGHT)
         
         # Update starfield
         self.update_starfield()
-        
-        # Check for collisions
-        self.check_collisions()
     
-    def render(self):
-        # Draw background
-        screen.blit(background_img, (0, 0))
+    def render(self, alpha=1.0):
+        # alpha is how far the frame lies between the last two ticks; moving
+        # objects are drawn at positions blended between those ticks
+        profiler = self.profiler
+        if profiler is not None:
+            render_start = time.perf_counter_ns()
+        renderer = self.renderer
+        draw = renderer.blit
         
-        # Draw starfield
-        for star in self.stars:
-            pygame.draw.circle(screen, star[4], (int(star[0]), int(star[1])), star[2])
+        # Overlays cover the whole screen, so they force a full redraw
+        scene_change = self.game_over or self.pause
+        if scene_change:
+            renderer.invalidate()
+            alpha = 1.0  # Nothing is moving, draw the current tick as is
+        
+        def lerp(previous, current):
+            return int(previous + (current - previous) * alpha)
+        
+        # Repaint background and starfield where things changed
+        renderer.begin_frame()
         
         # Draw shields
         for shield in self.shields:
-            screen.blit(shield.image, shield.rect)
+            draw(shield.image, shield.rect)
         
         # Draw player if visible
         if self.player.visible:
-            screen.blit(self.player.image, self.player.rect)
+            player_x = lerp(self.player.prev_x, self.player.rect.x)
+            draw(self.player.image, (player_x, self.player.rect.y))
             
             # Draw shield effect if active
             if self.player.shield:
-                # Draw a translucent shield effect
-                shield_surface = pygame.Surface((PLAYER_SIZE + 20, PLAYER_SIZE + 20), pygame.SRCALPHA)
-                pygame.draw.circle(shield_surface, (0, 255, 255, 100), 
-                                  (PLAYER_SIZE // 2 + 10, PLAYER_SIZE // 2 + 10), 
-                                  PLAYER_SIZE // 2 + 10, 3)
-                screen.blit(shield_surface, (self.player.rect.x - 10, self.player.rect.y - 10))
+                draw(player_shield_img, (player_x - 10, self.player.rect.y - 10))
         
         # Draw enemies
-        for enemy in self.enemies:
-            if enemy.exploding:
-                # Draw the current explosion frame
-                if enemy.explosion_index < len(explosion_imgs):
-                    screen.blit(explosion_imgs[enemy.explosion_index], enemy.rect)
-            else:
-                screen.blit(enemy.image, enemy.rect)
+        for enemy, position in zip(self.enemies, self.swarm.positions(alpha)):
+            draw(enemy.image, position)
+
+        # Draw the current frame of each explosion
+        for explosion in self.explosions:
+            draw(explosion.image, explosion.rect)
+        
+        # Draw explosion particles in one additive pass
+        particle_area = self.explosion_particles.draw(screen, alpha)
+        if particle_area is not None:
+            renderer.add_dirty(particle_area)
         
         # Draw bullets
         for bullet in self.bullets:
-            screen.blit(bullet.image, bullet.rect)
+            draw(bullet.image, (bullet.rect.x, lerp(bullet.prev_y, bullet.rect.y)))
         
         for bullet in self.enemy_bullets:
-            screen.blit(bullet.image, bullet.rect)
+            draw(bullet.image, (bullet.rect.x, lerp(bullet.prev_y, bullet.rect.y)))
         
         # Draw powerups
         for powerup in self.powerups:
-            screen.blit(powerup.image, powerup.rect)
+            draw(powerup.image, (powerup.rect.x, lerp(powerup.prev_y, powerup.rect.y)))
         
         # Draw HUD
-        self.render_hud()
+        if profiler is None:
+            self.render_hud()
+        else:
+            hud_start = time.perf_counter_ns()
+            self.render_hud()
+            hud_time = time.perf_counter_ns() - hud_start
+            profiler.add(PROFILE_HUD, hud_time)
+            if profiler.show_overlay:
+                self.render_profiler()
         
         # Draw game over screen
         if self.game_over:
@@ -768,6 +1582,17 @@ class Game:
         # Draw pause screen
         if self.pause:
             self.render_pause()
+        
+        # Push the changed areas to the display
+        renderer.present()
+        if scene_change:
+            # The next frame has to repaint everything the overlay darkened
+            renderer.invalidate()
+        
+        if profiler is not None:
+            profiler.add(PROFILE_RENDER, time.perf_counter_ns() - render_start - hud_time)
+            profiler.end_frame()
+
     def render_hud(self):
         # Draw score
         score_text = self.font.render(f"Score: {self.score}", True, WHITE)
@@ -809,6 +1634,29 @@ class Game:
             timer_width = int((1 - (self.player.dash_cooldown / (FPS * 2))) * 100)
             pygame.draw.rect(screen, WHITE, (SCREEN_WIDTH - 150, 150, 100, 10), 1)
             pygame.draw.rect(screen, YELLOW, (SCREEN_WIDTH - 150, 150, timer_width, 10))
+
+        # Draw object pool usage (toggle with F3)
+        if self.show_pool_stats:
+            self.render_pool_stats()
+
+    def render_pool_stats(self):
+        pools = [("Bullets", bullet_pool), ("Powerups", powerup_pool), ("Explosions", explosion_pool)]
+        for i, (name, pool) in enumerate(pools):
+            text = self.small_font.render(f"{name}: {pool.live} live / {len(pool.free)} pooled", True, WHITE)
+            screen.blit(text, (10, SCREEN_HEIGHT - 80 + i * 22))
+    
+    def render_profiler(self):
+        # Rolling frame timings (toggle with F2)
+        stats = self.profiler.percentiles()
+        if stats is None:
+            return
+        x, y = SCREEN_WIDTH - 320, SCREEN_HEIGHT - 20 - 20 * len(PROFILE_PHASES)
+        header = self.small_font.render("phase       p50    p95    p99 ms", True, YELLOW)
+        self.renderer.blit(header, (x, y - 20))
+        for i, phase in enumerate(PROFILE_PHASES):
+            p50, p95, p99 = stats[i]
+            text = self.small_font.render(f"{phase:<10} {p50:6.2f} {p95:6.2f} {p99:6.2f}", True, WHITE)
+            self.renderer.blit(text, (x, y + i * 20))
     
     def render_game_over(self):
         # Darken the screen
@@ -883,7 +1731,8 @@ class Game:
             pass
     
     def start_new_game(self):
-        self.__init__()
+        self.recycle_objects()
+        self.__init__(self.difficulty, input_source=self.input_source, profiler=self.profiler)
 
 
 def show_menu():
@@ -899,8 +1748,14 @@ def show_menu():
     start_text = small_font.render("Press ENTER to Start", True, WHITE)
     start_rect = start_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
     
+    swarm_text = small_font.render("Press S for Swarm Mode", True, WHITE)
+    swarm_rect = swarm_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 35))
+    
+    bullet_hell_text = small_font.render("Press B for Bullet Hell", True, WHITE)
+    bullet_hell_rect = bullet_hell_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 70))
+    
     quit_text = small_font.render("Press ESC to Quit", True, WHITE)
-    quit_rect = quit_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
+    quit_rect = quit_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 105))
     
     # Load high scores
     high_scores = []
@@ -943,7 +1798,13 @@ def show_menu():
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_RETURN:
                     menu_music.stop()
-                    return True  # Start the game
+                    return "normal"  # Start the game
+                if event.key == pygame.K_s:
+                    menu_music.stop()
+                    return "swarm"
+                if event.key == pygame.K_b:
+                    menu_music.stop()
+                    return "bullet_hell"
                 if event.key == pygame.K_ESCAPE:
                     pygame.quit()
                     sys.exit()
@@ -979,15 +1840,17 @@ def show_menu():
         start_surface.blit(start_text, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
         screen.blit(start_surface, start_rect)
         
+        screen.blit(swarm_text, swarm_rect)
+        screen.blit(bullet_hell_text, bullet_hell_rect)
         screen.blit(quit_text, quit_rect)
         
         # Draw high scores
         high_score_text = small_font.render("HIGH SCORES", True, YELLOW)
-        screen.blit(high_score_text, (SCREEN_WIDTH // 2 - 80, SCREEN_HEIGHT // 2 + 100))
+        screen.blit(high_score_text, (SCREEN_WIDTH // 2 - 80, SCREEN_HEIGHT // 2 + 135))
         
         for i, score in enumerate(high_scores):
             text = small_font.render(f"{i+1}. {score}", True, WHITE)
-            screen.blit(text, (SCREEN_WIDTH // 2 - 50, SCREEN_HEIGHT // 2 + 130 + i * 30))
+            screen.blit(text, (SCREEN_WIDTH // 2 - 50, SCREEN_HEIGHT // 2 + 165 + i * 30))
         
         pygame.display.flip()
         clock.tick(FPS)
@@ -995,17 +1858,97 @@ def show_menu():
     return False
 
 
-def main():
+def run_headless(game, ticks):
+    # Step the simulation as fast as possible without rendering. Returns the
+    # number of ticks actually simulated (fewer if the game ended early).
+    for tick in range(ticks):
+        if game.game_over:
+            return tick
+        game.step()
+        if game.profiler is not None:
+            game.profiler.end_frame()
+    return ticks
+
+
+def run_replay(path, headless=False, profile_csv=None):
+    # Feed a recorded session back through the simulation. Headless replays
+    # run at full speed, so a recording doubles as a repeatable benchmark.
+    difficulty, games = load_recording(path)
+    profiler = FrameProfiler() if profile_csv else None
+    total_ticks = 0
+    start = time.perf_counter()
+    for number, (seed, states, score) in enumerate(games, 1):
+        game = Game(difficulty, seed, input_source=ScriptedInput(states), profiler=profiler)
+        source = game.input_source
+        while source.index < len(states) and not game.game_over:
+            game.step()
+            total_ticks += 1
+            if headless:
+                if profiler is not None:
+                    profiler.end_frame()
+                continue
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return
+            game.render()
+            game.clock.tick(FPS)
+
+        result = "matches recording" if game.score == score else f"recorded {score}, replay diverged"
+        print(f"Game {number}: seed {seed}, {len(states)} input ticks, score {game.score} ({result})")
+        game.recycle_objects()
+
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {total_ticks} ticks in {elapsed:.2f}s ({total_ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    if profiler is not None:
+        profiler.dump_csv(profile_csv)
+
+
+def run_benchmark(wave_sizes=BENCHMARK_WAVE_SIZES, ticks=BENCHMARK_TICKS, seed=0):
+    # Regression baseline: simulation speed and per-phase cost per wave size
+    print(f"{'wave':>6} {'ticks':>6} {'ticks/s':>9} {'spawn':>8} {'move':>8} {'shoot':>8} {'collide':>8}  (ms/tick)")
+    for wave_size in wave_sizes:
+        game = Game(seed=seed, input_source=patrol_script())
+        game.settings.update(BENCHMARK_LAYOUT, base_wave=wave_size, max_wave=wave_size)
+        game.player.lives = 10 ** 9  # Keep the player alive for the whole run
+        game.phase_times = {}
+
+        start = time.perf_counter()
+        simulated = run_headless(game, ticks)
+        elapsed = time.perf_counter() - start
+
+        per_tick = [game.phase_times.get(name, 0) / max(1, simulated) / 1e6
+                    for name in ("spawn", "move", "shoot", "collisions")]
+        print(f"{wave_size:>6} {simulated:>6} {simulated / elapsed:>9.0f} "
+              + " ".join(f"{ms:>8.3f}" for ms in per_tick))
+        game.recycle_objects()
+
+
+def main(seed=None, profile_csv=None, record=None):
     # Show menu first
-    if not show_menu():
+    difficulty = show_menu()
+    if not difficulty:
         pygame.quit()
         sys.exit()
     
-    # Start the game
-    game = Game()
+    # Record the keyboard state of every tick if a recording was requested
+    recorder = InputRecorder(KeyboardInput(), difficulty) if record else None
+    
+    # Start the game, profiling from the first frame if a CSV was requested
+    game = Game(difficulty, seed, input_source=recorder, profiler=FrameProfiler() if profile_csv else None)
+    if recorder is not None:
+        recorder.start_game(game.seed)
+    
+    # The simulation runs at a fixed FPS ticks per second no matter how fast
+    # frames are drawn; the accumulator holds real time not yet simulated
+    accumulator = 0.0
+    previous_time = time.perf_counter()
     
     running = True
     while running:
+        now = time.perf_counter()
+        accumulator += now - previous_time
+        previous_time = now
+        
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -1013,32 +1956,85 @@ def main():
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_p:
                     game.pause = not game.pause
+
+                if event.key == pygame.K_F3:
+                    game.show_pool_stats = not game.show_pool_stats
+
+                # F2 starts the frame profiler, then toggles its overlay
+                if event.key == pygame.K_F2:
+                    if game.profiler is None:
+                        game.profiler = FrameProfiler()
+                    else:
+                        game.profiler.show_overlay = not game.profiler.show_overlay
                 
                 if game.game_over:
                     if event.key == pygame.K_r:
-                        game = Game()  # Start a new game
+                        if recorder is not None:
+                            recorder.end_game(game.score)
+                        game.start_new_game()
+                        if recorder is not None:
+                            recorder.start_game(game.seed)
                     elif event.key == pygame.K_q:
                         running = False
         
         # Process input (outside of event loop to get smooth movement)
-        if not game.game_over and not game.pause:
-            game.process_input()
-        
-        # Update game state
-        game.update()
+        # and update game state, catching up with a bounded number of ticks
+        ticks = 0
+        while accumulator >= TICK_SECONDS and ticks < MAX_TICKS_PER_FRAME:
+            game.step()
+            accumulator -= TICK_SECONDS
+            ticks += 1
+        if ticks == MAX_TICKS_PER_FRAME:
+            # Too far behind: drop the backlog and let the game slow down
+            # instead of spending ever longer catching up
+            accumulator = min(accumulator, TICK_SECONDS)
         
-        # Render everything
-        game.render()
-        
-        # Update the display
-        pygame.display.flip()
+        # Render everything and update the display
+        game.render(accumulator / TICK_SECONDS)
         
         # Cap the frame rate
-        game.clock.tick(FPS)
+        game.clock.tick(RENDER_FPS)
 
+    if profile_csv and game.profiler is not None:
+        game.profiler.dump_csv(profile_csv)
+    if recorder is not None:
+        recorder.end_game(game.score)
+        recorder.save(record)
     pygame.quit()
     sys.exit()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Space Invaders")
+    parser.add_argument("--seed", type=int, help="seed the random number generators")
+    parser.add_argument("--headless", action="store_true",
+                        help="run a scripted game without a window and print the result")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="measure simulation speed for a range of wave sizes")
+    parser.add_argument("--difficulty", choices=sorted(DIFFICULTIES), default="normal",
+                        help="difficulty for headless runs")
+    parser.add_argument("--ticks", type=int, default=BENCHMARK_TICKS,
+                        help="ticks to simulate per headless or benchmark run")
+    parser.add_argument("--waves", type=int, nargs="+", default=BENCHMARK_WAVE_SIZES,
+                        help="wave sizes to benchmark")
+    parser.add_argument("--profile-csv", metavar="PATH",
+                        help="profile every frame and write the timings to a CSV file on exit")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the session's seed and inputs to a file on exit")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="play back a recorded session, at full speed with --headless")
+    args = parser.parse_args()
+
+    if args.replay:
+        run_replay(args.replay, args.headless, args.profile_csv)
+    elif args.benchmark:
+        run_benchmark(args.waves, args.ticks, args.seed or 0)
+    elif args.headless:
+        game = Game(args.difficulty, args.seed, input_source=patrol_script(),
+                    profiler=FrameProfiler() if args.profile_csv else None)
+        simulated = run_headless(game, args.ticks)
+        print(f"Simulated {simulated} ticks: score {game.score}, level {game.level}, lives {game.player.lives}")
+        if args.profile_csv:
+            game.profiler.dump_csv(args.profile_csv)
+    else:
+        main(args.seed, args.profile_csv, args.record)
\ No newline at end of file
@@ -1,9 +1,13 @@
 import os
 import shutil
+import fnmatch
 import tkinter as tk
 from tkinter import filedialog, ttk
 import threading
 import datetime
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 class FileOrganizer:
     def __init__(self, root):
@@ -37,6 +41,19 @@ class FileOrganizer:
         self.custom_categories = {}
         self.is_organizing = False
         
+        # Scan options
+        self.recursive = tk.BooleanVar(value=False)
+        self.include_patterns = tk.StringVar()
+        self.exclude_patterns = tk.StringVar()
+        
+        # Parallel moves: a few workers suit a local SSD, network shares often want more
+        self.worker_count = tk.IntVar(value=4)
+        self.progress_queue = queue.Queue()
+        self.total_files = 0
+        self.done_files = 0
+        self.done_bytes = 0
+        self.organize_started = 0.0
+        
         self.create_widgets()
     
     def create_widgets(self):
@@ -99,6 +116,72 @@ class FileOrganizer:
         )
         browse_button.pack(side=tk.RIGHT)
         
+        # Scan options frame
+        options_frame = tk.Frame(dir_frame, bg=self.secondary_color)
+        options_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        recursive_checkbox = tk.Checkbutton(
+            options_frame,
+            text="Include subfolders",
+            variable=self.recursive,
+            font=("Helvetica", 10),
+            fg=self.text_color,
+            bg=self.secondary_color,
+            selectcolor=self.bg_color,
+            activebackground=self.secondary_color,
+            activeforeground=self.text_color
+        )
+        recursive_checkbox.pack(side=tk.LEFT, padx=(0, 10))
+        
+        for label_text, variable in (("Include:", self.include_patterns), ("Exclude:", self.exclude_patterns)):
+            pattern_label = tk.Label(
+                options_frame,
+                text=label_text,
+                font=("Helvetica", 10),
+                fg=self.text_color,
+                bg=self.secondary_color
+            )
+            pattern_label.pack(side=tk.LEFT, padx=(0, 5))
+            
+            pattern_entry = tk.Entry(
+                options_frame,
+                textvariable=variable,
+                font=("Helvetica", 10),
+                bg=self.bg_color,
+                fg=self.text_color,
+                bd=0,
+                width=15,
+                highlightthickness=1,
+                highlightbackground=self.accent_color,
+                insertbackground=self.text_color
+            )
+            pattern_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
+        
+        workers_label = tk.Label(
+            options_frame,
+            text="Workers:",
+            font=("Helvetica", 10),
+            fg=self.text_color,
+            bg=self.secondary_color
+        )
+        workers_label.pack(side=tk.LEFT, padx=(0, 5))
+        
+        workers_spinbox = tk.Spinbox(
+            options_frame,
+            from_=1,
+            to=64,
+            textvariable=self.worker_count,
+            font=("Helvetica", 10),
+            bg=self.bg_color,
+            fg=self.text_color,
+            bd=0,
+            width=4,
+            highlightthickness=1,
+            highlightbackground=self.accent_color,
+            insertbackground=self.text_color
+        )
+        workers_spinbox.pack(side=tk.LEFT)
+        
         # Categories frame
         categories_frame = tk.Frame(main_frame, bg=self.secondary_color, padx=15, pady=15)
         categories_frame.pack(fill=tk.BOTH, expand=True)
@@ -349,94 +432,258 @@ class FileOrganizer:
             self.status_label.config(text="Please select at least one category to organize.", fg=self.warning_color)
             return
         
+        # Comma separated glob patterns, e.g. "*.tmp, node_modules"
+        include = [pattern.strip() for pattern in self.include_patterns.get().split(",") if pattern.strip()]
+        exclude = [pattern.strip() for pattern in self.exclude_patterns.get().split(",") if pattern.strip()]
+        
+        try:
+            workers = max(1, self.worker_count.get())
+        except tk.TclError:
+            self.status_label.config(text="Please enter a whole number of workers.", fg=self.warning_color)
+            return
+        
         # Start organizing in a separate thread
         self.is_organizing = True
         self.organize_button.config(state=tk.DISABLED)
+        self.progress.config(mode='indeterminate', value=0)
         self.progress.pack(fill=tk.X, pady=(15, 0))
         self.progress.start()
-        self.status_label.config(text="Organizing files...", fg=self.text_color)
-        
-        organize_thread = threading.Thread(target=self.organize_files, args=(directory, active_categories))
+        self.status_label.config(text="Counting files...", fg=self.text_color)
+        
+        # Progress is reported by the workers through a queue polled from the Tk loop
+        self.progress_queue = queue.Queue()
+        self.total_files = 0
+        self.done_files = 0
+        self.done_bytes = 0
+        self.organize_started = time.perf_counter()
+        self.root.after(100, self.poll_progress)
+        
+        organize_thread = threading.Thread(
+            target=self.organize_files,
+            args=(directory, active_categories, self.recursive.get(), include, exclude, workers)
+        )
         organize_thread.daemon = True
         organize_thread.start()
     
-    def organize_files(self, directory, categories):
+    def walk_files(self, directory, recursive=False, include=(), exclude=(), skip_dirs=(), on_error=None):
+        # Stream the files under directory as os.DirEntry objects. scandir
+        # already knows each entry's type, so no extra stat is needed per file,
+        # and entries are yielded as they are read instead of being collected
+        # into a list, keeping memory flat however large the directory is.
+        # Excluded names are skipped, excluded folders are not descended into,
+        # and skip_dirs are top level folders (the category folders) to leave alone.
+        # A folder that can't be read is passed to on_error and skipped
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            try:
+                entries = os.scandir(current)
+            except OSError as e:
+                if on_error is not None:
+                    on_error(current, e)
+                continue
+            with entries:
+                for entry in entries:
+                    if any(fnmatch.fnmatch(entry.name, pattern) for pattern in exclude):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and not (current == directory and entry.name in skip_dirs):
+                            pending.append(entry.path)
+                    elif entry.is_file():
+                        if not include or any(fnmatch.fnmatch(entry.name, pattern) for pattern in include):
+                            yield entry
+    
+    def poll_progress(self):
+        # Drain the worker reports and refresh the progress bar and status line
+        if not self.is_organizing:
+            return
+        
+        while True:
+            try:
+                kind, value = self.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "total":
+                # Counting is done and moving starts, time the rate from here
+                self.total_files = value
+                self.organize_started = time.perf_counter()
+                self.progress.stop()
+                self.progress.config(mode='determinate', maximum=max(value, 1), value=0)
+            else:
+                self.done_files += 1
+                self.done_bytes += value
+        
+        if self.total_files:
+            self.progress.config(value=self.done_files)
+            elapsed = time.perf_counter() - self.organize_started
+            rate = self.done_files / elapsed if elapsed > 0 else 0
+            if rate:
+                eta = datetime.timedelta(seconds=int((self.total_files - self.done_files) / rate))
+            else:
+                eta = "--"
+            self.status_label.config(
+                text=f"Organizing files... {self.done_files} of {self.total_files} "
+                     f"({self.done_bytes / 1e6:.1f} MB), {rate:.0f} files/s, ETA {eta}",
+                fg=self.text_color
+            )
+        
+        self.root.after(100, self.poll_progress)
+    
+    def build_category_index(self, categories):
+        # Map each extension to its category once, so classifying a file is a
+        # single dict lookup. The first category listing an extension wins
+        category_index = {}
+        for category, extensions in categories.items():
+            for extension in extensions:
+                category_index.setdefault(extension.lower(), category)
+        return category_index
+    
+    def organize_files(self, directory, categories, recursive=False, include=(), exclude=(), workers=4):
         try:
-            # Create a log file
+            # Create a log file, written as files are moved rather than kept in memory
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             log_path = os.path.join(directory, f"file_organizer_log_{timestamp}.txt")
-            log_content = [f"File Organization Log - {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"]
-            log_content.append(f"Directory: {directory}\n")
-            log_content.append("Categories:\n")
-            
-            for category, extensions in categories.items():
-                log_content.append(f"- {category}: {', '.join(extensions)}\n")
-            
-            log_content.append("\nMoved Files:\n")
-            
-            # Count files
-            all_files = [f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))]
-            processed_count = 0
-            moved_count = 0
-            
-            # Process files
-            for filename in all_files:
-                file_path = os.path.join(directory, filename)
+            with open(log_path, 'w') as log_file:
+                log_file.write(f"File Organization Log - {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                log_file.write(f"Directory: {directory}\n")
+                log_file.write("Categories:\n")
                 
-                # Skip log files
-                if filename.startswith("file_organizer_log_"):
-                    continue
+                for category, extensions in categories.items():
+                    log_file.write(f"- {category}: {', '.join(extensions)}\n")
                 
-                processed_count += 1
+                if recursive:
+                    log_file.write("Subfolders: included\n")
+                if include:
+                    log_file.write(f"Include: {', '.join(include)}\n")
+                if exclude:
+                    log_file.write(f"Exclude: {', '.join(exclude)}\n")
                 
-                # Get file extension
-                _, file_extension = os.path.splitext(filename)
-                file_extension = file_extension.lower()
+                log_file.write("\nMoved Files:\n")
                 
-                # Find matching category
-                target_category = "Other"
-                for category, extensions in categories.items():
-                    if file_extension in extensions:
-                        target_category = category
-                        break
+                # Output folders of every known category are left alone, not just
+                # the selected ones, so earlier runs are never undone. Nested
+                # categories like "Work/Reports" live under their top level folder
+                known_categories = list(self.file_types) + list(self.custom_categories) + list(categories) + ["Other"]
+                skip_dirs = {os.path.normpath(category).split(os.sep)[0] for category in known_categories}
                 
-                # Create category folder if it doesn't exist
-                category_folder = os.path.join(directory, target_category)
-                if not os.path.exists(category_folder):
-                    os.makedirs(category_folder)
+                # A quick pass over the names gives the total for the progress bar
+                total = sum(
+                    1 for entry in self.walk_files(directory, recursive, include, exclude, skip_dirs)
+                    if not entry.name.startswith("file_organizer_log_")
+                )
+                self.progress_queue.put(("total", total))
                 
-                # Move file to category folder
-                new_path = os.path.join(category_folder, filename)
+                processed_count = 0
+                moved_count = 0
                 
-                # Handle duplicate file names
-                base_name, extension = os.path.splitext(filename)
-                counter = 1
-                while os.path.exists(new_path):
-                    new_filename = f"{base_name}_{counter}{extension}"
-                    new_path = os.path.join(category_folder, new_filename)
-                    counter += 1
+                # Classification lookups. folder_names holds, for each category
+                # folder known to exist, the names in it (lowercased, so names
+                # differing only in case count as taken on any file system),
+                # including names given to moves still in flight. next_suffix
+                # remembers the next counter to try per folder and base name
+                category_index = self.build_category_index(categories)
+                folder_names = {}
+                next_suffix = {}
+                folder_errors = {}  # category folders that can't be used, with the reason
                 
-                try:
-                    shutil.move(file_path, new_path)
-                    moved_count += 1
-                    log_content.append(f"- {filename} -> {target_category}/{os.path.basename(new_path)}\n")
-                except Exception as e:
-                    log_content.append(f"- ERROR: Failed to move {filename}: {str(e)}\n")
-            
-            # Create "Other" folder for uncategorized files if needed
-            if "Other" not in categories:
-                other_folder = os.path.join(directory, "Other")
-                if os.path.exists(other_folder) and not os.listdir(other_folder):
-                    os.rmdir(other_folder)
-            
-            # Summary
-            log_content.append("\nSummary:\n")
-            log_content.append(f"- Files processed: {processed_count}\n")
-            log_content.append(f"- Files moved: {moved_count}\n")
-            
-            # Write log file
-            with open(log_path, 'w') as log_file:
-                log_file.writelines(log_content)
+                # Moves run on a pool of workers so that I/O for different files
+                # overlaps. At most a few moves per worker are queued at a time
+                lock = threading.Lock()
+                slots = threading.BoundedSemaphore(workers * 4)
+                
+                def move_file(entry, relative_path, target_category, new_path):
+                    # Runs on a worker thread
+                    nonlocal moved_count
+                    try:
+                        size = entry.stat(follow_symlinks=False).st_size
+                        shutil.move(entry.path, new_path)
+                        message = f"- {relative_path} -> {target_category}/{os.path.basename(new_path)}\n"
+                    except Exception as e:
+                        size = None
+                        message = f"- ERROR: Failed to move {relative_path}: {str(e)}\n"
+                    with lock:
+                        if size is not None:
+                            moved_count += 1
+                        log_file.write(message)
+                    self.progress_queue.put(("moved", size or 0))
+                    slots.release()
+                
+                def folder_skipped(path, error):
+                    with lock:
+                        log_file.write(f"- SKIPPED: Could not read folder {os.path.relpath(path, directory)}: {str(error)}\n")
+                
+                # Process files as the walker finds them, leaving the executor
+                # only once the last move has finished
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for entry in self.walk_files(directory, recursive, include, exclude, skip_dirs, folder_skipped):
+                        filename = entry.name
+                        relative_path = os.path.relpath(entry.path, directory)
+                        
+                        # Skip log files
+                        if filename.startswith("file_organizer_log_"):
+                            continue
+                        
+                        processed_count += 1
+                        
+                        # Get file extension
+                        _, file_extension = os.path.splitext(filename)
+                        file_extension = file_extension.lower()
+                        
+                        # Find matching category
+                        target_category = category_index.get(file_extension, "Other")
+                        
+                        # Create category folder if it doesn't exist, or read the
+                        # names already in it, once per run
+                        category_folder = os.path.join(directory, target_category)
+                        names = folder_names.get(category_folder)
+                        if names is None and category_folder not in folder_errors:
+                            try:
+                                try:
+                                    os.makedirs(category_folder)
+                                    names = set()
+                                except FileExistsError:
+                                    with os.scandir(category_folder) as existing:
+                                        names = {existing_entry.name.lower() for existing_entry in existing}
+                                folder_names[category_folder] = names
+                            except OSError as e:
+                                # e.g. a file named like the category is in the way
+                                folder_errors[category_folder] = str(e)
+                        
+                        # Files of a category whose folder can't be used fail on their own
+                        if names is None:
+                            with lock:
+                                log_file.write(f"- ERROR: Failed to move {relative_path}: {folder_errors[category_folder]}\n")
+                            self.progress_queue.put(("moved", 0))
+                            continue
+                        
+                        # Handle duplicate file names without touching the disk
+                        new_filename = filename
+                        if new_filename.lower() in names:
+                            base_name, extension = os.path.splitext(filename)
+                            suffix_key = (category_folder, base_name.lower(), extension.lower())
+                            counter = next_suffix.get(suffix_key, 1)
+                            new_filename = f"{base_name}_{counter}{extension}"
+                            while new_filename.lower() in names:
+                                counter += 1
+                                new_filename = f"{base_name}_{counter}{extension}"
+                            next_suffix[suffix_key] = counter + 1
+                        names.add(new_filename.lower())
+                        
+                        # Move file to category folder
+                        new_path = os.path.join(category_folder, new_filename)
+                        slots.acquire()
+                        executor.submit(move_file, entry, relative_path, target_category, new_path)
+                    
+                # Create "Other" folder for uncategorized files if needed
+                if "Other" not in categories:
+                    other_folder = os.path.join(directory, "Other")
+                    if os.path.exists(other_folder) and not os.listdir(other_folder):
+                        os.rmdir(other_folder)
+                
+                # Summary
+                log_file.write("\nSummary:\n")
+                log_file.write(f"- Files processed: {processed_count}\n")
+                log_file.write(f"- Files moved: {moved_count}\n")
             
             # Update UI on the main thread
             self.root.after(0, self.organize_completed, moved_count, processed_count, log_path)
@@ -445,6 +692,7 @@ class FileOrganizer:
             self.root.after(0, self.organize_failed, str(e))
     
     def organize_completed(self, moved_count, processed_count, log_path):
+        self.poll_progress()
         self.progress.stop()
         self.progress.pack_forget()
         self.is_organizing = False